@@ -0,0 +1,43 @@
+"""Notify the market data publisher on outbox inserts
+
+Revision ID: a4d7c2e91b3f
+Revises: 8c0c9b8a2d2d, 9c1a2b3d4e5f
+Create Date: 2025-09-06 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d7c2e91b3f"
+down_revision: Union[str, Sequence[str], None] = ("8c0c9b8a2d2d", "9c1a2b3d4e5f")
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Send a NOTIFY on market_data_outbox after each insert statement."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_market_data_outbox() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('market_data_outbox', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER market_data_outbox_notify
+        AFTER INSERT ON market_data_outbox
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_market_data_outbox()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS market_data_outbox_notify ON market_data_outbox")
+    op.execute("DROP FUNCTION IF EXISTS notify_market_data_outbox()")
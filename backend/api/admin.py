@@ -134,7 +134,7 @@ async def tweets_sync():
 
         # Prune old timestamped backups, keep last 10
         backups = backup_service.list_backups()
-        timestamped = [b for b in backups if b.name != "tweets_backup.json"]
+        timestamped = [b for b in backups if not backup_service.is_main_backup(b)]
         removed: list[str] = []
         if len(timestamped) > 10:
             old_backups = timestamped[:-10]
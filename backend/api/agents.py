@@ -260,6 +260,11 @@ async def update_agent(
             raise HTTPException(status_code=404, detail=f"Agent not found: {agent_id}")
 
         await session.commit()
+
+        # Running agents cache their active flag, so stop a deactivated one directly
+        if request.is_active is False:
+            await agent_manager.stop_agent(agent_id)
+
         return agent
 
 
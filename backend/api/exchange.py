@@ -51,19 +51,13 @@ async def get_current_price(ticker: str) -> CurrentPrice:
 
     snapshot = order_router.get_order_book(ticker)
 
-    # Get best bid/ask from order book
-    best_bid_in_cents = max(snapshot.bids.keys()) if snapshot.bids else None
-    best_ask_in_cents = min(snapshot.asks.keys()) if snapshot.asks else None
-    bid_size = snapshot.bids.get(best_bid_in_cents)
-    ask_size = snapshot.asks.get(best_ask_in_cents)
-
     return CurrentPrice(
         ticker=ticker,
         current_price_in_cents=snapshot.current_price_in_cents,
-        best_bid_in_cents=best_bid_in_cents,
-        best_ask_in_cents=best_ask_in_cents,
-        bid_size=bid_size,
-        ask_size=ask_size,
+        best_bid_in_cents=snapshot.best_bid_in_cents,
+        best_ask_in_cents=snapshot.best_ask_in_cents,
+        bid_size=snapshot.bid_size,
+        ask_size=snapshot.ask_size,
         timestamp=snapshot.timestamp,
     )
 
@@ -77,19 +71,14 @@ async def get_all_prices() -> List[CurrentPrice]:
     for ticker in order_router.get_tickers():
         snapshot = order_router.get_order_book(ticker)
 
-        best_bid_in_cents = max(snapshot.bids.keys()) if snapshot.bids else None
-        best_ask_in_cents = min(snapshot.asks.keys()) if snapshot.asks else None
-        bid_size = snapshot.bids.get(best_bid_in_cents)
-        ask_size = snapshot.asks.get(best_ask_in_cents)
-
         prices.append(
             CurrentPrice(
                 ticker=ticker,
                 current_price_in_cents=snapshot.current_price_in_cents,
-                best_bid_in_cents=best_bid_in_cents,
-                best_ask_in_cents=best_ask_in_cents,
-                bid_size=bid_size,
-                ask_size=ask_size,
+                best_bid_in_cents=snapshot.best_bid_in_cents,
+                best_ask_in_cents=snapshot.best_ask_in_cents,
+                bid_size=snapshot.bid_size,
+                ask_size=snapshot.ask_size,
                 timestamp=snapshot.timestamp,
             )
         )
@@ -2,7 +2,12 @@
 API endpoint for receiving X/Twitter webhooks
 """
 
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from typing import Any
+
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
@@ -16,12 +21,65 @@ router = APIRouter(prefix="/webhook", tags=["x_webhook"])
 webhook_service = XWebhookService()
 
 
-@router.post("/x/tweets", response_model=WebhookProcessingResult)
+def _body_errors(e: ValidationError) -> list:
+    """Locate validation errors under "body", as FastAPI does for declared body params"""
+    return [{**err, "loc": ("body", *err["loc"])} for err in e.errors()]
+
+
+def _inline_refs(schema: Any, defs: dict) -> Any:
+    """Replace local $defs references so the schema can be embedded anywhere in OpenAPI"""
+    if isinstance(schema, dict):
+        if "$ref" in schema:
+            return _inline_refs(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+        return {key: _inline_refs(value, defs) for key, value in schema.items() if key != "$defs"}
+    if isinstance(schema, list):
+        return [_inline_refs(item, defs) for item in schema]
+    return schema
+
+
+_payload_schema = WebhookPayload.model_json_schema()
+# The handler reads the raw body itself, so document the payload it validates by hand
+_WEBHOOK_OPENAPI_EXTRA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": _inline_refs(_payload_schema, _payload_schema.get("$defs", {}))
+            }
+        },
+    }
+}
+
+
+@router.post(
+    "/x/tweets", response_model=WebhookProcessingResult, openapi_extra=_WEBHOOK_OPENAPI_EXTRA
+)
 async def receive_tweet_webhook(
-    payload: WebhookPayload,
+    request: Request,
     x_api_key: str = Header(None, alias="X-API-Key"),
     db: AsyncSession = Depends(get_db),
 ) -> WebhookProcessingResult:
+    # Decode ourselves and drop tweets by non-ticker authors before validation, so
+    # broadcast fan-out never pays for building models that would only be skipped
+    body = await request.body()
+    try:
+        data = orjson.loads(body)
+        skipped_tweets = webhook_service.drop_untracked_raw_tweets(data)
+        payload = WebhookPayload.model_validate(data)
+    except orjson.JSONDecodeError as e:
+        raise RequestValidationError(
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body",),
+                    "msg": "JSON decode error",
+                    "input": {},
+                    "ctx": {"error": str(e)},
+                }
+            ]
+        ) from e
+    except ValidationError as e:
+        raise RequestValidationError(_body_errors(e)) from e
 
     if payload.event_type == "test_webhook_url":
         return WebhookProcessingResult(
@@ -52,7 +110,9 @@ async def receive_tweet_webhook(
     # Process payload within transaction
     try:
         repo = XDataRepository(db)
-        result = await webhook_service.process_webhook_without_commit(repo, payload)
+        result = await webhook_service.process_webhook_without_commit(
+            repo, payload, skipped_tweets
+        )
         await db.commit()
         return result
     except Exception as e:
@@ -15,6 +15,7 @@ engine = create_async_engine(
     pool_size=20,
     max_overflow=10,
     pool_pre_ping=True,  # Verify connections before using
+    pool_recycle=1800,  # Replace connections before server/proxy idle timeouts drop them
     isolation_level="READ COMMITTED",  # Explicit - fine for single-writer per symbol
     # Disable asyncpg statement cache to avoid InvalidCachedStatementError after DDL changes
     connect_args={"statement_cache_size": 0},
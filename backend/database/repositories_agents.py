@@ -12,7 +12,14 @@ from sqlmodel import and_, desc, func, select
 
 from database.models import AgentMemory, AgentThought, AIAgent
 from enums import AgentMemoryType, AgentThoughtType, AgentToolName, LLMModel
-from models.schemas.agents import Agent, AgentMemoryState, AgentStats, MemoryInfo, ThoughtInfo
+from models.schemas.agents import (
+    Agent,
+    AgentMemoryState,
+    AgentStats,
+    MemoryInfo,
+    ThoughtCreate,
+    ThoughtInfo,
+)
 
 
 class AgentRepository:
@@ -70,6 +77,20 @@ class AgentRepository:
             last_processed_tweet_at=agent.last_processed_tweet_at,
         )
 
+    def _db_to_thought_info(self, thought: AgentThought) -> ThoughtInfo:
+        """Convert DB thought to Pydantic model"""
+        return ThoughtInfo(
+            thought_id=thought.thought_id,
+            agent_id=thought.agent_id,
+            step_number=thought.step_number,
+            thought_type=thought.thought_type,
+            content=thought.content,
+            tool_name=thought.tool_name,
+            tool_args=thought.tool_args,
+            tool_result=thought.tool_result,
+            created_at=thought.created_at,
+        )
+
     async def create_agent_without_commit(
         self,
         name: str,
@@ -210,6 +231,45 @@ class AgentRepository:
             created_at=memory.created_at,
         )
 
+    async def save_compressed_memory_without_commit(
+        self,
+        agent_id: UUID,
+        content: str,
+        token_count: int,
+    ) -> MemoryInfo:
+        """Save a compressed memory and reset working memory to empty in one flush"""
+        await self.session.execute(
+            delete(AgentMemory).where(
+                and_(
+                    AgentMemory.agent_id == agent_id,
+                    AgentMemory.memory_type == AgentMemoryType.WORKING,
+                )
+            )
+        )
+
+        compressed = AgentMemory(
+            agent_id=agent_id,
+            memory_type=AgentMemoryType.COMPRESSED,
+            content=content,
+            token_count=token_count,
+        )
+        working = AgentMemory(
+            agent_id=agent_id,
+            memory_type=AgentMemoryType.WORKING,
+            content="",
+            token_count=0,
+        )
+        self.session.add_all([compressed, working])
+        await self.session.flush()
+
+        return MemoryInfo(
+            memory_id=compressed.memory_id,
+            memory_type=compressed.memory_type,
+            content=compressed.content,
+            token_count=compressed.token_count,
+            created_at=compressed.created_at,
+        )
+
     async def get_agent_memory(self, agent_id: UUID) -> AgentMemoryState:
         """Get current memory state for an agent"""
         result = await self.session.execute(
@@ -246,32 +306,6 @@ class AgentRepository:
             total_tokens=total_tokens,
         )
 
-    async def update_thought_with_result_without_commit(
-        self, thought_id: UUID, tool_result: str
-    ) -> ThoughtInfo:
-        """Update a thought with a result"""
-        result = await self.session.execute(
-            select(AgentThought).where(AgentThought.thought_id == thought_id)
-        )
-        thought = result.scalar_one_or_none()
-        if not thought:
-            raise ValueError(f"Thought not found: {thought_id}")
-
-        thought.tool_result = tool_result
-        await self.session.flush()
-
-        return ThoughtInfo(
-            thought_id=thought.thought_id,
-            agent_id=thought.agent_id,
-            step_number=thought.step_number,
-            thought_type=thought.thought_type,
-            content=thought.content,
-            tool_name=thought.tool_name,
-            tool_args=thought.tool_args,
-            tool_result=thought.tool_result,
-            created_at=thought.created_at,
-        )
-
     async def create_thought_without_commit(
         self,
         agent_id: UUID,
@@ -295,17 +329,52 @@ class AgentRepository:
         self.session.add(thought)
         await self.session.flush()
 
-        return ThoughtInfo(
-            thought_id=thought.thought_id,
-            agent_id=thought.agent_id,
-            step_number=thought.step_number,
-            thought_type=thought.thought_type,
-            content=thought.content,
-            tool_name=thought.tool_name,
-            tool_args=thought.tool_args,
-            tool_result=thought.tool_result,
-            created_at=thought.created_at,
+        return self._db_to_thought_info(thought)
+
+    async def create_thoughts_without_commit(
+        self, thoughts: List[ThoughtCreate]
+    ) -> List[ThoughtInfo]:
+        """Create several thoughts with a single flush, returned in submission order"""
+        if not thoughts:
+            return []
+
+        db_thoughts = [
+            AgentThought(
+                agent_id=t.agent_id,
+                step_number=t.step_number,
+                thought_type=t.thought_type,
+                content=t.content,
+                tool_name=t.tool_name,
+                tool_args=t.tool_args,
+                tool_result=t.tool_result,
+            )
+            for t in thoughts
+        ]
+        self.session.add_all(db_thoughts)
+        await self.session.flush()
+
+        return [self._db_to_thought_info(t) for t in db_thoughts]
+
+    async def update_thoughts_with_results_without_commit(
+        self, results: List[tuple[UUID, str]]
+    ) -> List[ThoughtInfo]:
+        """Set tool results on several thoughts, returned in the order given"""
+        if not results:
+            return []
+
+        result = await self.session.execute(
+            select(AgentThought).where(AgentThought.thought_id.in_([tid for tid, _ in results]))
         )
+        thoughts_by_id = {t.thought_id: t for t in result.scalars().all()}
+
+        for thought_id, tool_result in results:
+            thought = thoughts_by_id.get(thought_id)
+            if not thought:
+                raise ValueError(f"Thought not found: {thought_id}")
+            thought.tool_result = tool_result
+        await self.session.flush()
+
+        return [self._db_to_thought_info(thoughts_by_id[tid]) for tid, _ in results]
 
     async def get_agent_stats(self, agent_id: UUID) -> Optional[AgentStats]:
         """Get comprehensive agent statistics"""
@@ -377,20 +446,7 @@ class AgentRepository:
         thoughts = thoughts_result.scalars().all()
 
         # Convert DB models to ThoughtInfo schema objects
-        return [
-            ThoughtInfo(
-                thought_id=thought.thought_id,
-                agent_id=thought.agent_id,
-                step_number=thought.step_number,
-                thought_type=thought.thought_type,
-                content=thought.content,
-                tool_name=thought.tool_name,
-                tool_args=thought.tool_args,
-                tool_result=thought.tool_result,
-                created_at=thought.created_at,
-            )
-            for thought in thoughts
-        ]
+        return [self._db_to_thought_info(thought) for thought in thoughts]
 
     async def cleanup_old_memories_without_commit(
         self,
@@ -398,9 +454,9 @@ class AgentRepository:
         keep_last_n: int = 10,
     ) -> int:
         """Clean up old compressed memories, keeping the most recent N"""
-        # Get compressed memories ordered by creation time
-        result = await self.session.execute(
-            select(AgentMemory)
+        # Select everything past the newest N and delete it in one statement
+        stale_ids = (
+            select(AgentMemory.memory_id)
             .where(
                 and_(
                     AgentMemory.agent_id == agent_id,
@@ -408,16 +464,12 @@ class AgentRepository:
                 )
             )
             .order_by(desc(AgentMemory.created_at))
+            .offset(keep_last_n)
         )
-        memories = result.scalars().all()
-
-        # Delete all but the most recent N
-        deleted_count = 0
-        for memory in memories[keep_last_n:]:
-            await self.session.delete(memory)
-            deleted_count += 1
-
-        return deleted_count
+        result = await self.session.execute(
+            delete(AgentMemory).where(AgentMemory.memory_id.in_(stale_ids))
+        )
+        return int(result.rowcount or 0)
 
     async def prune_agent_thoughts_without_commit(self, keep_last_n: int = 500) -> int:
         """
@@ -428,33 +480,22 @@ class AgentRepository:
         if keep_last_n < 0:
             keep_last_n = 0
 
-        # Get all agent ids that have thoughts
-        result_agents = await self.session.execute(
-            select(AgentThought.agent_id).group_by(AgentThought.agent_id)
-        )
-        agent_ids = list(result_agents.scalars().all())
-
-        total_deleted = 0
-        if not agent_ids:
-            return 0
-
-        # For each agent, fetch thoughts ordered by created_at desc and delete beyond N
-        for agent_id in agent_ids:
-            thoughts_result = await self.session.execute(
-                select(AgentThought.thought_id)
-                .where(AgentThought.agent_id == agent_id)
-                .order_by(desc(AgentThought.created_at))
-                .offset(keep_last_n)
+        # Single statement: rank each agent's thoughts newest first, delete beyond N
+        ranked = select(
+            AgentThought.thought_id,
+            func.row_number()
+            .over(partition_by=AgentThought.agent_id, order_by=desc(AgentThought.created_at))
+            .label("rn"),
+        ).subquery()
+        del_stmt = (
+            delete(AgentThought)
+            .where(
+                AgentThought.thought_id.in_(  # type: ignore[attr-defined]
+                    select(ranked.c.thought_id).where(ranked.c.rn > keep_last_n)
+                )
             )
-            thought_ids_to_delete = list(thoughts_result.scalars().all())
-            if not thought_ids_to_delete:
-                continue
-
-            del_stmt = delete(AgentThought).where(
-                AgentThought.thought_id.in_(thought_ids_to_delete)
-            )  # type: ignore[arg-type]
-            result = await self.session.execute(del_stmt)
-            await self.session.flush()
-            total_deleted += int(result.rowcount or len(thought_ids_to_delete))
-
-        return total_deleted
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(del_stmt)
+        await self.session.flush()
+        return int(result.rowcount or 0)
@@ -4,6 +4,7 @@ Repository for double-entry bookkeeping.
 
 import uuid
 
+from sqlalchemy import Select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import func, select
 
@@ -66,16 +67,26 @@ class LedgerRepository:
         for entry in cash_entries + share_entries:
             self.session.add(entry)
 
-    async def get_cash_balance_in_cents(self, trader_id: uuid.UUID) -> int:
-        """Get current cash balance in cents"""
-        result = await self.session.execute(
+    @staticmethod
+    def cash_balance_in_cents_query(trader_id: uuid.UUID) -> Select:
+        """
+        One-row SELECT of a trader's cash balance, labelled balance_in_cents.
+        For embedding in other queries as a subquery.
+        """
+        return (
             select(
-                func.coalesce(func.sum(LedgerEntry.debit_in_cents), 0)
-                - func.coalesce(func.sum(LedgerEntry.credit_in_cents), 0)
+                (
+                    func.coalesce(func.sum(LedgerEntry.debit_in_cents), 0)
+                    - func.coalesce(func.sum(LedgerEntry.credit_in_cents), 0)
+                ).label("balance_in_cents")
             )
             .where(LedgerEntry.trader_id == trader_id)
             .where(LedgerEntry.account == "CASH")
         )
+
+    async def get_cash_balance_in_cents(self, trader_id: uuid.UUID) -> int:
+        """Get current cash balance in cents"""
+        result = await self.session.execute(self.cash_balance_in_cents_query(trader_id))
         return result.scalar() or 0
 
     async def get_share_balance(self, trader_id: uuid.UUID, ticker: str) -> int:
@@ -2,7 +2,10 @@
 Repository for market data outbox pattern.
 """
 from datetime import datetime, timezone
+from typing import List, Optional
+from uuid import UUID
 
+import orjson
 from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
@@ -50,12 +53,13 @@ class OutboxRepository:
         self.session.add(event)
 
     async def publish_batch_with_commit(
-        self, redis_client=None, limit: int = 100
+        self, redis_client=None, limit: int = 100, event_ids: Optional[List[UUID]] = None
     ) -> int:
         """
         Atomically claim and publish outbox events.
         This DOES commit as it's a separate autonomous transaction.
         Uses skip_locked to allow multiple workers without contention.
+        Pass event_ids to reuse a caller-owned scratch list across batches.
         """
         # Use FOR UPDATE SKIP LOCKED to avoid contention between workers
         result = await self.session.execute(
@@ -68,13 +72,18 @@ class OutboxRepository:
         events = result.scalars().all()
 
         if events and redis_client:
-            # Publish to Redis/WebSocket
-            for event in events:
-                channel = f"{event.event_type.value.lower()}.{event.ticker}"
-                await redis_client.publish(channel, event.payload)
+            # Publish to Redis/WebSocket, queued on a pipeline so the batch is one round-trip
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for event in events:
+                    channel = f"{event.event_type.value.lower()}.{event.ticker}"
+                    pipe.publish(channel, orjson.dumps(event.payload, option=orjson.OPT_NAIVE_UTC))
+                await pipe.execute()
 
             # Mark as published
-            event_ids = [e.event_id for e in events]
+            if event_ids is None:
+                event_ids = []
+            event_ids.clear()
+            event_ids.extend(e.event_id for e in events)
             await self.session.execute(
                 update(MarketDataOutbox)
                 .where(MarketDataOutbox.event_id.in_(event_ids))
@@ -2,12 +2,14 @@
 Repository for position tracking.
 """
 import uuid
+from dataclasses import dataclass
 from typing import List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import and_, select
 
 from database.models import Position
+from database.repositories_ledger import LedgerRepository
 
 
 class PositionRepository:
@@ -99,3 +101,28 @@ class PositionRepository:
             .where(Position.quantity > 0)
         )
         return list(result.scalars().all())
+
+    @dataclass(frozen=True)
+    class PortfolioSnapshot:
+        cash_balance_in_cents: int
+        positions: List[Position]
+
+    async def get_portfolio_snapshot(
+        self, trader_id: uuid.UUID
+    ) -> "PositionRepository.PortfolioSnapshot":
+        """Get cash balance and all open positions for a trader in one query"""
+        # The ungrouped aggregate always yields exactly one row, so outer joining positions
+        # onto it returns the balance even when the trader holds nothing
+        cash = LedgerRepository.cash_balance_in_cents_query(trader_id).subquery()
+        result = await self.session.execute(
+            select(cash.c.balance_in_cents, Position).select_from(
+                cash.outerjoin(
+                    Position, and_(Position.trader_id == trader_id, Position.quantity > 0)
+                )
+            )
+        )
+        rows = result.all()
+        return PositionRepository.PortfolioSnapshot(
+            cash_balance_in_cents=rows[0][0] or 0,
+            positions=[position for _, position in rows if position is not None],
+        )
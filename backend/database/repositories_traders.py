@@ -3,12 +3,14 @@ Repository for trader accounts.
 """
 
 import uuid
+from dataclasses import dataclass
 from typing import List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import desc, select
 
 from database.models import TraderAccount
+from database.repositories_ledger import LedgerRepository
 
 
 class TraderRepository:
@@ -52,6 +54,36 @@ class TraderRepository:
         )
         return result.scalar_one_or_none()
 
+    @dataclass(frozen=True)
+    class ValidationState:
+        is_active: bool
+        cash_balance_in_cents: Optional[int]
+
+    async def get_trader_state_for_validation_or_none(
+        self, trader_id: uuid.UUID, include_cash: bool = True
+    ) -> Optional["TraderRepository.ValidationState"]:
+        """
+        Get trader's active flag and cash balance in one query, locking the trader row
+        until the transaction ends - returns None if not found.
+        Must be called within a transaction context.
+        """
+        columns = [TraderAccount.is_active]
+        if include_cash:
+            cash_balance = LedgerRepository.cash_balance_in_cents_query(trader_id)
+            columns.append(cash_balance.scalar_subquery())
+
+        result = await self.session.execute(
+            select(*columns)
+            .where(TraderAccount.trader_id == trader_id)
+            .with_for_update(of=TraderAccount)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        return TraderRepository.ValidationState(
+            is_active=row[0], cash_balance_in_cents=(row[1] or 0) if include_cash else None
+        )
+
     async def get_all_traders(self) -> List[TraderAccount]:
         """Get all traders"""
         result = await self.session.execute(
@@ -6,7 +6,8 @@ from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
 from typing import List, Optional
 
-from sqlalchemy import delete
+import orjson
+from sqlalchemy import column, delete, table, text
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -57,6 +58,32 @@ class XDataRepository:
     Note: Methods with _in_transaction suffix do NOT commit - caller must manage transaction boundaries.
     """
 
+    # Batches larger than this are COPYed into a staging table and merged from there
+    TWEET_COPY_THRESHOLD = 64
+    TWEET_STAGING_TABLE = "x_tweets_staging"
+    # Columns written by tweet upserts; all but tweet_id/author_username/tweet_created_at
+    # are refreshed on conflict
+    TWEET_UPSERT_COLUMNS = (
+        "tweet_id",
+        "author_username",
+        "text",
+        "retweet_count",
+        "reply_count",
+        "like_count",
+        "quote_count",
+        "view_count",
+        "bookmark_count",
+        "is_reply",
+        "reply_to_tweet_id",
+        "conversation_id",
+        "in_reply_to_username",
+        "quoted_tweet_id",
+        "retweeted_tweet_id",
+        "entities",
+        "tweet_created_at",
+        "fetched_at",
+    )
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
@@ -185,6 +212,185 @@ class XDataRepository:
         await self.session.flush()
         return result.scalar_one()
 
+    async def bulk_upsert_users_without_commit(self, users: List[UserInfo]) -> int:
+        """
+        Insert or update many users in one statement.
+        Must be called within a transaction context - does NOT commit.
+
+        Returns:
+            Number of distinct users upserted
+        """
+        now = datetime.now(timezone.utc)
+        # A statement can't touch the same row twice, so the last entry per username wins
+        rows = {
+            user_info.username: {
+                "username": user_info.username,
+                "name": user_info.name,
+                "description": user_info.description,
+                "location": user_info.location,
+                "num_followers": user_info.num_followers,
+                "num_following": user_info.num_following,
+                "fetched_at": now,
+            }
+            for user_info in users
+        }
+        if not rows:
+            return 0
+
+        stmt = insert(XUser).values(list(rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["username"],
+            set_={
+                "name": stmt.excluded.name,
+                "description": stmt.excluded.description,
+                "location": stmt.excluded.location,
+                "num_followers": stmt.excluded.num_followers,
+                "num_following": stmt.excluded.num_following,
+                "fetched_at": stmt.excluded.fetched_at,
+            },
+        )
+        await self.session.execute(stmt)
+        await self.session.flush()
+        return len(rows)
+
+    async def bulk_insert_missing_users_without_commit(self, users: List[UserInfo]) -> List[str]:
+        """
+        Insert users that don't exist yet in one statement; existing users are left untouched.
+        Must be called within a transaction context - does NOT commit.
+
+        Returns:
+            Usernames that were inserted (the rest already existed)
+        """
+        now = datetime.now(timezone.utc)
+        rows = {
+            user_info.username: {
+                "username": user_info.username,
+                "name": user_info.name,
+                "description": user_info.description,
+                "location": user_info.location,
+                "num_followers": user_info.num_followers,
+                "num_following": user_info.num_following,
+                "fetched_at": now,
+            }
+            for user_info in users
+        }
+        if not rows:
+            return []
+
+        stmt = (
+            insert(XUser)
+            .values(list(rows.values()))
+            .on_conflict_do_nothing(index_elements=["username"])
+            .returning(XUser.username)
+        )
+        result = await self.session.execute(stmt)
+        await self.session.flush()
+        return list(result.scalars().all())
+
+    async def bulk_upsert_tweets_without_commit(
+        self, tweets: List[tuple[TweetInfo, str]]
+    ) -> int:
+        """
+        Insert or update many tweets in one statement.
+        Must be called within a transaction context - does NOT commit.
+
+        Args:
+            tweets: (tweet, author_username) pairs; authors must exist in x_users table
+
+        Returns:
+            Number of distinct tweets upserted
+        """
+        now = datetime.now(timezone.utc)
+        # A statement can't touch the same row twice, so the last entry per tweet_id wins
+        rows = {
+            tweet.tweet_id: {
+                "tweet_id": tweet.tweet_id,
+                "author_username": author_username,
+                "text": tweet.text,
+                "retweet_count": tweet.retweet_count,
+                "reply_count": tweet.reply_count,
+                "like_count": tweet.like_count,
+                "quote_count": tweet.quote_count,
+                "view_count": tweet.view_count,
+                "bookmark_count": tweet.bookmark_count,
+                "is_reply": tweet.is_reply,
+                "reply_to_tweet_id": tweet.reply_to_tweet_id,
+                "conversation_id": tweet.conversation_id,
+                "in_reply_to_username": tweet.in_reply_to_username,
+                "quoted_tweet_id": tweet.quoted_tweet_id,
+                "retweeted_tweet_id": tweet.retweeted_tweet_id,
+                "entities": tweet.entities.model_dump() if tweet.entities else None,
+                "tweet_created_at": parse_twitter_date(tweet.created_at),
+                "fetched_at": now,
+            }
+            for tweet, author_username in tweets
+        }
+        if not rows:
+            return 0
+
+        if len(rows) > self.TWEET_COPY_THRESHOLD:
+            await self._copy_tweets_to_staging_without_commit(list(rows.values()))
+            staging = table(
+                self.TWEET_STAGING_TABLE, *(column(name) for name in self.TWEET_UPSERT_COLUMNS)
+            )
+            stmt = insert(XTweet).from_select(list(self.TWEET_UPSERT_COLUMNS), staging.select())
+        else:
+            stmt = insert(XTweet).values(list(rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["tweet_id"],
+            set_={
+                "text": stmt.excluded.text,
+                "retweet_count": stmt.excluded.retweet_count,
+                "reply_count": stmt.excluded.reply_count,
+                "like_count": stmt.excluded.like_count,
+                "quote_count": stmt.excluded.quote_count,
+                "view_count": stmt.excluded.view_count,
+                "bookmark_count": stmt.excluded.bookmark_count,
+                "is_reply": stmt.excluded.is_reply,
+                "reply_to_tweet_id": stmt.excluded.reply_to_tweet_id,
+                "conversation_id": stmt.excluded.conversation_id,
+                "in_reply_to_username": stmt.excluded.in_reply_to_username,
+                "quoted_tweet_id": stmt.excluded.quoted_tweet_id,
+                "retweeted_tweet_id": stmt.excluded.retweeted_tweet_id,
+                "entities": stmt.excluded.entities,
+                "fetched_at": stmt.excluded.fetched_at,
+            },
+        )
+        await self.session.execute(stmt)
+        if len(rows) > self.TWEET_COPY_THRESHOLD:
+            # Leave staging empty for the next batch on this connection
+            await self.session.execute(text(f"TRUNCATE {self.TWEET_STAGING_TABLE}"))
+        await self.session.flush()
+        return len(rows)
+
+    async def _copy_tweets_to_staging_without_commit(self, rows: List[dict]) -> None:
+        """
+        COPY tweet rows into a per-connection temp staging table.
+        Must be called within a transaction context - does NOT commit.
+        """
+        # Temp tables are private to the connection; rows also vanish at commit/rollback
+        await self.session.execute(
+            text(
+                f"CREATE TEMP TABLE IF NOT EXISTS {self.TWEET_STAGING_TABLE} "
+                "(LIKE x_tweets INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+        )
+        records = [
+            tuple(
+                # asyncpg's COPY takes JSONB as text
+                orjson.dumps(row[name]).decode()
+                if name == "entities" and row[name] is not None
+                else row[name]
+                for name in self.TWEET_UPSERT_COLUMNS
+            )
+            for row in rows
+        ]
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            self.TWEET_STAGING_TABLE, records=records, columns=self.TWEET_UPSERT_COLUMNS
+        )
+
     async def get_user_or_none(self, username: str) -> Optional[UserInfo]:
         """Get cached user by username - returns None if not found"""
         result = await self.session.execute(select(XUser).where(XUser.username == username))
@@ -221,20 +427,18 @@ class XDataRepository:
         if keep_last_n < 0:
             keep_last_n = 0
 
-        # Get tweet IDs to delete (all beyond the most recent N)
-        ids_result = await self.session.execute(
-            select(XTweet.tweet_id).order_by(desc(XTweet.tweet_created_at)).offset(keep_last_n)
+        # Single statement: delete everything outside the most recent N
+        keep_ids = (
+            select(XTweet.tweet_id).order_by(desc(XTweet.tweet_created_at)).limit(keep_last_n)
+        )
+        del_stmt = (
+            delete(XTweet)
+            .where(XTweet.tweet_id.not_in(keep_ids))  # type: ignore[union-attr]
+            .execution_options(synchronize_session=False)
         )
-        tweet_ids_to_delete = list(ids_result.scalars().all())
-
-        if not tweet_ids_to_delete:
-            return 0
-
-        del_stmt = delete(XTweet).where(XTweet.tweet_id.in_(tweet_ids_to_delete))  # type: ignore[arg-type]
         result = await self.session.execute(del_stmt)
         await self.session.flush()
-        # rowcount might be None on some drivers; fall back to computed len
-        return int(result.rowcount or len(tweet_ids_to_delete))
+        return int(result.rowcount or 0)
 
     async def get_tweets_by_ids(self, tweet_ids: List[str]) -> List[XTweet]:
         """
@@ -369,7 +573,7 @@ class XDataRepository:
             limit: Maximum number of tweets to return
 
         Returns:
-            List of tweets with author data loaded
+            List of tweets with author data loaded, ordered by fetched_at ascending
         """
         # Eagerly load the author relationship to avoid async lazy-loads
         query = select(XTweet).options(selectinload(XTweet.author))
@@ -388,7 +592,7 @@ class XDataRepository:
         self, after_timestamp: Optional[datetime], limit: int = 100
     ) -> List[TweetForAgent]:
         """
-        Get tweets as TweetForAgent models for agent processing.
+        Get tweets as TweetForAgent models for agent processing, oldest fetch first.
         Uses mapper to convert SQLAlchemy models to Pydantic models.
         """
         tweets = await self.get_tweets_after_timestamp(after_timestamp, limit)
@@ -47,7 +47,7 @@ class OrderRouter:
         await asyncio.gather(*self.processor_tasks.values(), return_exceptions=True)
 
     async def submit_order(self, order_id: UUID, ticker: str) -> None:
-        """Route order to correct processor"""
+        """Route order to correct processor (enqueue only; returns before matching)"""
         if ticker not in self.processors:
             raise ValueError(f"No processor for ticker: {ticker}")
 
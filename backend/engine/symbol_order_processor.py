@@ -45,12 +45,13 @@ class SymbolOrderProcessor:
     async def submit_order(self, order_id: UUID):
         """Queue order for processing"""
         msg = NewOrderMessage(order_id=order_id)
-        await self.order_queue.put(msg)
+        # Unbounded queue, so this never waits; matching happens on the processor task
+        self.order_queue.put_nowait(msg)
 
     async def cancel_order(self, order_id: UUID, cancel_reason: CancelReason = CancelReason.USER):
         """Queue order cancellation"""
         msg = CancelOrderMessage(order_id=order_id, cancel_reason=cancel_reason)
-        await self.order_queue.put(msg)
+        self.order_queue.put_nowait(msg)
 
     async def _process_order_message(self, msg: OrderMessage):
         """Process order message based on type"""
@@ -1,6 +1,9 @@
 import asyncio
+import logging
 import os
-from contextlib import asynccontextmanager
+import queue
+from contextlib import asynccontextmanager, contextmanager
+from logging.handlers import QueueHandler, QueueListener
 from typing import List
 
 import uvicorn
@@ -27,52 +30,70 @@ from services.maintenance import DailyMaintenanceService
 load_dotenv()
 
 
+@contextmanager
+def queued_logging():
+    """Send root log records through a queue so writing them never blocks the event loop"""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = QueueHandler(log_queue)
+    listener = QueueListener(log_queue, logging.StreamHandler(), respect_handler_level=True)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(handler)
+    listener.start()
+    try:
+        yield
+    finally:
+        # Detach first so nothing is queued after the listener stops draining
+        root_logger.removeHandler(handler)
+        listener.stop()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Manage application lifecycle - startup and shutdown.
     """
-    # Startup
-    print("Starting X-Traders Exchange...")
+    with queued_logging():
+        # Startup
+        print("Starting X-Traders Exchange...")
 
-    # Initialize database
-    await init_db()
+        # Initialize database
+        await init_db()
 
-    # Initialize order router and processors
-    await order_router.initialize(TICKERS)
+        # Initialize order router and processors
+        await order_router.initialize(TICKERS)
 
-    # Start order expiration service
-    expiration_service = OrderExpirationService(order_router)
-    expiration_task = asyncio.create_task(expiration_service.start())
+        # Start order expiration service
+        expiration_service = OrderExpirationService(order_router)
+        expiration_task = asyncio.create_task(expiration_service.start())
 
-    # Start agent manager
-    await agent_manager.start()
-    agent_monitor_task = asyncio.create_task(agent_manager.monitor_agents())
+        # Start agent manager
+        await agent_manager.start()
+        agent_monitor_task = asyncio.create_task(agent_manager.monitor_agents())
 
-    # Start daily maintenance service at 03:00 UTC
-    maintenance_service = DailyMaintenanceService()
-    await maintenance_service.start()
+        # Start daily maintenance service at 03:00 UTC
+        maintenance_service = DailyMaintenanceService()
+        await maintenance_service.start()
 
-    yield
+        yield
 
-    # Shutdown
-    print("Shutting down X-Traders Exchange...")
+        # Shutdown
+        print("Shutting down X-Traders Exchange...")
 
-    # Stop agent manager
-    await agent_manager.stop()
+        # Stop agent manager
+        await agent_manager.stop()
 
-    # Stop services
-    await expiration_service.stop()
-    await maintenance_service.stop()
+        # Stop services
+        await expiration_service.stop()
+        await maintenance_service.stop()
 
-    # Shutdown order router
-    await order_router.shutdown()
+        # Shutdown order router
+        await order_router.shutdown()
 
-    # Cancel background tasks
-    expiration_task.cancel()
-    agent_monitor_task.cancel()
+        # Cancel background tasks
+        expiration_task.cancel()
+        agent_monitor_task.cancel()
 
-    print("Exchange shutdown complete")
+        print("Exchange shutdown complete")
 
 
 # Create FastAPI app
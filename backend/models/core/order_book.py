@@ -103,6 +103,7 @@ class OrderBook:
     def to_snapshot(self) -> OrderBookSnapshot:
         """Convert to API snapshot format"""
 
+        # Dicts keep the SortedDict iteration order, so levels stay best-first
         bids: Dict[int, int] = {}
         for price, orders in self.bids.items():
             bids[price] = sum(o.remaining_quantity for o in orders)
@@ -128,6 +129,10 @@ class OrderBook:
             ticker=self.ticker,
             bids=bids,
             asks=asks,
+            best_bid_in_cents=best_bid[0] if best_bid else None,
+            best_ask_in_cents=best_ask[0] if best_ask else None,
+            bid_size=bids[best_bid[0]] if best_bid else None,
+            ask_size=asks[best_ask[0]] if best_ask else None,
             current_price_in_cents=current_price,
             last_price_in_cents=self.last_price_in_cents,
             timestamp=datetime.now(timezone.utc),
@@ -70,6 +70,18 @@ class ThoughtInfo(BaseModel):
     created_at: datetime
 
 
+class ThoughtCreate(BaseModel):
+    """A thought to be inserted as part of a batch"""
+
+    agent_id: UUID
+    step_number: int
+    thought_type: AgentThoughtType
+    content: str
+    tool_name: Optional[AgentToolName] = None
+    tool_args: Optional[str] = None
+    tool_result: Optional[str] = None
+
+
 class MemoryInfo(BaseModel):
     """Agent memory information"""
 
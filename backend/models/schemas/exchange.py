@@ -61,8 +61,12 @@ class OrderBookSnapshot(BaseModel):
     """Order book snapshot for API responses"""
 
     ticker: str
-    bids: Dict[int, int]  # price_in_cents -> total_quantity
-    asks: Dict[int, int]  # price_in_cents -> total_quantity
+    bids: Dict[int, int]  # price_in_cents -> total_quantity, highest price first
+    asks: Dict[int, int]  # price_in_cents -> total_quantity, lowest price first
+    best_bid_in_cents: Optional[int] = None
+    best_ask_in_cents: Optional[int] = None
+    bid_size: Optional[int] = None  # Total quantity at the best bid
+    ask_size: Optional[int] = None  # Total quantity at the best ask
     current_price_in_cents: Optional[int] = None
     last_price_in_cents: Optional[int] = None
     timestamp: datetime
@@ -49,6 +49,7 @@ class TweetInfo(BaseModel):
     quoted_tweet_id: Optional[str] = None
     retweeted_tweet_id: Optional[str] = None
     entities: Optional[TweetEntities] = None
+    author_username: Optional[str] = None
 
     class Config:
         extra = "allow"  # Allow extra fields from API
@@ -124,6 +125,7 @@ class TweetInfo(BaseModel):
             "conversation_id": tweet_data.get("conversationId"),
             "in_reply_to_username": tweet_data.get("inReplyToUsername"),
             "entities": tweet_data.get("entities"),
+            "author_username": (tweet_data.get("author") or {}).get("userName"),
         }
 
         # Extract nested IDs from quoted/retweeted tweets
@@ -93,14 +93,19 @@ class TweetBackfiller:
 
                     # Fetch user info from API
                     print("  Fetching user info...")
-                    user_info = self.api_client.get_user_info(username)
+                    user_info_task = asyncio.create_task(self.api_client.get_user_info(username))
+                    try:
+                        # Check existing tweets count while the API request is in flight
+                        existing_tweets = await repo.get_tweets_by_username(username, limit=1)
+                    except BaseException:
+                        user_info_task.cancel()
+                        raise
+
+                    user_info = await user_info_task
                     await repo.upsert_user_without_commit(user_info)
                     stats.users_processed += 1
                     print(f"  ✓ User info saved ({user_info.num_followers:,} followers)")
 
-                    # Check existing tweets count
-                    existing_tweets = await repo.get_tweets_by_username(username, limit=1)
-
                     # Only fetch tweets if we don't have enough or they're stale
                     should_fetch_tweets = (
                         self.force_refresh
@@ -110,7 +115,9 @@ class TweetBackfiller:
 
                     if should_fetch_tweets:
                         print(f"  Fetching last {self.tweets_per_ticker} tweets...")
-                        tweets = self.api_client.get_last_tweets(username, self.tweets_per_ticker)
+                        tweets = await self.api_client.get_last_tweets(
+                            username, self.tweets_per_ticker
+                        )
 
                         # Store tweets (upsert handles duplicates)
                         for tweet in tweets:
@@ -185,7 +192,10 @@ async def main():
     print("=" * 50)
 
     backfiller = TweetBackfiller(force_refresh=args.force, stale_hours=args.stale_hours)
-    stats = await backfiller.backfill_all_tickers()
+    try:
+        stats = await backfiller.backfill_all_tickers()
+    finally:
+        await XApiClient.aclose()
 
     # Exit with error code if failed
     sys.exit(0 if stats.success else 1)
@@ -44,7 +44,7 @@ async def main():
             # Clean up old backups (keep last 10)
             backups = backup_service.list_backups()
             # Exclude main backup file from cleanup
-            timestamped_backups = [b for b in backups if b.name != "tweets_backup.json"]
+            timestamped_backups = [b for b in backups if not backup_service.is_main_backup(b)]
 
             if len(timestamped_backups) > 10:
                 old_backups = timestamped_backups[:-10]
@@ -3,17 +3,20 @@ Autonomous trading agent using LangGraph for state management
 """
 
 import asyncio
-import json
+import functools
+import time
+from contextlib import aclosing
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
+import orjson
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, ToolMessage
 from langgraph.graph import END, StateGraph
-from pydantic import BaseModel, Field
 
-from enums import AgentThoughtType, AgentToolName
-from models.schemas.agents import Agent, ThoughtInfo
+from enums import AgentThoughtType, AgentToolName, ModelProvider
+from models.schemas.agents import Agent, ThoughtCreate, ThoughtInfo
 from models.schemas.tweet_feed import TweetForAgent
 from services.agents.agent_tools import (
     get_social_tools,
@@ -23,35 +26,84 @@ from services.agents.agent_tools import (
 )
 from services.agents.db_utils import (
     create_thought_safe,
+    create_thoughts_safe,
+    get_agent_and_new_tweets_safe,
     get_agent_safe,
-    get_tweets_safe,
-    update_last_processed_tweet_safe,
-    update_thought_with_result_safe,
+    update_thoughts_with_results_safe,
 )
 from services.agents.memory_manager import MemoryManager
 from services.agents.system_prompt import build_system_prompt
 from services.agents.utils import create_llm
 
+# Tools without side effects whose results may be reused for a few seconds. The agent's own
+# portfolio and order status are excluded since its trades change them immediately.
+READ_ONLY_TOOL_NAMES = frozenset(
+    name.value
+    for name in (
+        AgentToolName.CHECK_ORDER_BOOK,
+        AgentToolName.CHECK_PRICE,
+        AgentToolName.CHECK_ALL_PRICES,
+        AgentToolName.CHECK_RECENT_TRADES,
+        AgentToolName.LIST_TICKERS,
+        AgentToolName.GET_X_USER_INFO,
+        AgentToolName.GET_X_USER_TWEETS,
+        AgentToolName.GET_X_TWEETS_BY_IDS,
+        AgentToolName.GET_ALL_X_USERS,
+        AgentToolName.GET_X_RECENT_TWEETS,
+        AgentToolName.GET_TICKER_POSTS,
+        AgentToolName.GET_POST_COMMENTS,
+    )
+)
+
+# Stable content first and per-cycle values last, so provider prompt caches can reuse the prefix
+THINK_CONTEXT_TEMPLATE = """
+Memory context: {memory_context}
+{tweet_block}{error_block}
+Cycle: {cycle}
+Current timestamp: {timestamp}"""
+
+
+@functools.lru_cache(maxsize=1)
+def _get_shared_tools() -> tuple:
+    """Build the trader-agnostic X data and utility tools once for all agents"""
+    return tuple(get_x_data_tools() + get_utility_tools())
 
-class AgentState(BaseModel):
-    """State for the agent graph"""
+
+def _dumps_tool_json(value: Any) -> str:
+    """Serialize tool arguments/results to JSON, falling back to str() for unknown types"""
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+@dataclass(slots=True)
+class AgentState:
+    """State for the agent graph (a dataclass, so node transitions skip validation)"""
 
     agent_id: UUID
-    messages: List[BaseMessage] = Field(default_factory=list)
-    thoughts: List[ThoughtInfo] = Field(default_factory=list)  # For database storage
-    pending_tweets: List[TweetForAgent] = Field(default_factory=list)
-    pending_tool_calls: List = Field(default_factory=list)  # Tool calls from LLM
+    messages: List[BaseMessage] = field(default_factory=list)
+    thoughts: List[ThoughtInfo] = field(default_factory=list)  # For database storage
+    pending_tweets: List[TweetForAgent] = field(default_factory=list)
+    pending_tool_calls: List = field(default_factory=list)  # Tool calls from LLM
     memory_context: str = ""
     cycle_count: int = 0
     is_active: bool = True
     error_context: str = ""
     last_decision_id: Optional[UUID] = None  # Track current decision
+    dirty: bool = False  # Set when the current cycle produced thoughts or tool calls
 
 
 class AutonomousAgent:
     """Autonomous agent that makes trading decisions"""
 
     MAX_RECURSION_LIMIT = 1000000000
+    MESSAGE_WINDOW_SIZE = 20  # Recent messages kept verbatim between compactions
+    CONTEXT_BUDGET_FRACTION = 0.7  # Share of the model's usable context a prompt may fill
+    COMPACT_CHECK_TOKEN_DELTA = 1024  # Approx. memory growth before re-checking compaction
+    MAX_PARALLEL_TOOL_CALLS = 8  # Bounds fan-out so one response cannot drain the DB pool
+    TOOL_RESULT_CACHE_TTL_SECONDS = 5.0
+    TOOL_RESULT_CACHE_MAX_ENTRIES = 512
+    ACTIVE_CHECK_TTL_SECONDS = 30.0  # Admin deactivation also stops the task directly
+    IDLE_BACKOFF_BASE_SECONDS = 0.1
+    IDLE_BACKOFF_MAX_SECONDS = 5.0
 
     def __init__(self, agent: Agent):
         self.agent = agent
@@ -59,27 +111,46 @@ class AutonomousAgent:
         self.llm = create_llm(self.agent.llm_model, self.agent.temperature)
         self.memory_manager = MemoryManager(
             agent=agent,
+            llm=self.llm,
         )
         self.running = True
         self.tools_list = self._get_all_tools()  # List of StructuredTools for LLM
         self.tools_map = self._create_tool_registry()  # Map for execution
+        self._tool_semaphore = asyncio.Semaphore(self.MAX_PARALLEL_TOOL_CALLS)
+        # (expires_at monotonic seconds, serialized result) per read-only tool call
+        self._tool_result_cache: Dict[str, tuple[float, str]] = {}
+        # Bumped by every write tool; reads that started before a write don't get cached
+        self._tool_cache_generation = 0
+        # Bind once so tool JSON schemas are built at startup, not on every think cycle
+        self.llm_with_tools = self.llm.bind_tools(self.tools_list)
+        # Personality is fixed per agent; build the system message once and reuse it
+        self._system_message = self._build_system_message()
         self.graph = None  # Will hold the compiled graph
+        # Rough estimate (chars / 4) of memory added since the last compaction check;
+        # starts at the threshold so persisted memory is checked on the first cycle
+        self._tokens_since_compact_check = self.COMPACT_CHECK_TOKEN_DELTA
+        # Monotonic time of the last agent-row read; is_active rarely changes
+        self._active_checked_at = float("-inf")
+        # Consecutive think cycles with neither tool calls nor new tweets
+        self._idle_cycles = 0
 
     def _get_all_tools(self) -> List:
         """Get all available tools as StructuredTool objects"""
         # Pass trader_id to get wrapped tools that don't require trader_id parameter
         trading_tools = get_trading_tools(trader_id=self.trader_id)
-        x_data_tools = get_x_data_tools()
-        utility_tools = get_utility_tools()
         social_tools = get_social_tools(agent_id=str(self.agent.agent_id))
 
-        return trading_tools + x_data_tools + utility_tools + social_tools
+        return trading_tools + list(_get_shared_tools()) + social_tools
 
     def _create_tool_registry(self) -> Dict[str, Any]:
-        """Create registry mapping tool names to coroutines"""
+        """Create registry mapping tool names to coroutine functions"""
         registry = {}
         for tool in self.tools_list:
-            registry[tool.name] = tool.coroutine
+            if tool.coroutine is not None:
+                registry[tool.name] = tool.coroutine
+            else:
+                # Sync tools run in a worker thread so they can't block other agents
+                registry[tool.name] = functools.partial(asyncio.to_thread, tool.func)
         return registry
 
     def _create_graph(self) -> StateGraph:
@@ -119,63 +190,99 @@ class AutonomousAgent:
 
     async def check_active_node(self, state: AgentState) -> AgentState:
         """Check if agent is still active"""
-        # Use isolated database operation
-        agent = await get_agent_safe(self.agent.agent_id)
-        state.is_active = agent.is_active
+        # Back off exponentially while the agent has nothing to act on
+        if self._idle_cycles:
+            exponent = min(self._idle_cycles, 6)
+            await asyncio.sleep(
+                min(self.IDLE_BACKOFF_BASE_SECONDS * 2**exponent, self.IDLE_BACKOFF_MAX_SECONDS)
+            )
 
         # Increment cycle count
         state.cycle_count += 1
 
-        # Check for new tweets every 5 cycles
-        if state.cycle_count % 5 == 0:
-            # Use isolated database operation for tweets
-            state.pending_tweets = await get_tweets_safe(
-                after_timestamp=self.agent.last_processed_tweet_at,
-                limit=100,
-            )
+        state.dirty = False
+        fetch_tweets = state.cycle_count % 5 == 0
+        if (
+            not fetch_tweets
+            and time.monotonic() - self._active_checked_at < self.ACTIVE_CHECK_TTL_SECONDS
+        ):
+            # Recently confirmed active; skip the agent-row read this cycle
+            state.pending_tweets = []
+            return state
 
-            if state.pending_tweets:
-                # Update last processed timestamp in isolated transaction
-                latest_timestamp = max(t.fetched_at for t in state.pending_tweets)
-                await update_last_processed_tweet_safe(self.agent.agent_id, latest_timestamp)
+        # Check activity, and for new tweets every 5 cycles, in one isolated transaction.
+        # The tweet cursor comes from the fresh agent row, so each poll only sees new tweets.
+        agent, state.pending_tweets = await get_agent_and_new_tweets_safe(
+            self.agent.agent_id,
+            fetch_tweets=fetch_tweets,
+            tweet_limit=100,
+        )
+        state.is_active = agent.is_active
+        self._active_checked_at = time.monotonic() if agent.is_active else float("-inf")
 
         return state
 
+    def _build_system_message(self) -> SystemMessage:
+        """Build the static system prompt, marked for prompt caching where supported"""
+        # Build complete system prompt from personality
+        system_prompt = build_system_prompt(self.agent.personality_prompt)
+        if self.agent.llm_model.get_provider() != ModelProvider.ANTHROPIC:
+            # OpenAI-compatible providers cache long stable prefixes automatically
+            return SystemMessage(content=system_prompt)
+        return SystemMessage(
+            content=[
+                {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+            ]
+        )
+
     async def append_think_context_to_state_messages(self, state: AgentState) -> str:
         """Build the context for the think node"""
         # Get memory context
         state.memory_context = await self.memory_manager.get_formatted_memory_for_prompt()
 
-        # Build context
-        context = f"""
-Memory context: {state.memory_context}
-Current timestamp: {datetime.now(timezone.utc).isoformat()}
-Cycle: {state.cycle_count}
-"""
-
+        # Build context in a single pass instead of repeated concatenation
+        tweet_block = ""
         if state.pending_tweets:
-            context += f"\nNew tweets detected: {len(state.pending_tweets)} tweets"
-            # Show first few tweets
-            for tweet in state.pending_tweets:
-                context += f"\n- @{tweet.author_username}: {tweet.text}"
+            tweet_lines = [f"- @{t.author_username}: {t.text}" for t in state.pending_tweets]
+            tweet_block = (
+                f"\nNew tweets detected: {len(state.pending_tweets)} tweets\n"
+                + "\n".join(tweet_lines)
+            )
 
-        if state.error_context:
-            context += f"\n\nPrevious errors:\n{state.error_context}"
+        error_block = (
+            f"\n\nPrevious errors:\n{state.error_context}" if state.error_context else ""
+        )
+
+        context = THINK_CONTEXT_TEMPLATE.format(
+            memory_context=state.memory_context,
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            cycle=state.cycle_count,
+            tweet_block=tweet_block,
+            error_block=error_block,
+        )
 
         # Build messages - use existing messages or start fresh
         if not state.messages:
-            # Build complete system prompt from personality
-            system_prompt = build_system_prompt(self.agent.personality_prompt)
             state.messages = [
-                SystemMessage(content=system_prompt),
+                self._system_message,
                 HumanMessage(content=context),
             ]
         else:
             # Add new context as a message
             state.messages.append(HumanMessage(content=context))
 
+    async def _add_to_memory(self, thoughts: List[tuple[AgentThoughtType, str]]) -> None:
+        """Persist thoughts to working memory and track approximate growth since last check"""
+        await self.memory_manager.add_to_memory(thoughts)
+        self._tokens_since_compact_check += sum(len(content) for _, content in thoughts) // 4
+
     async def compact_if_needed(self, state: AgentState) -> None:
         """Compact memory if above threshold; also prune messages and insert a summary notice."""
+        # Skip the memory round-trip until enough new content has accumulated
+        if self._tokens_since_compact_check < self.COMPACT_CHECK_TOKEN_DELTA:
+            return
+        self._tokens_since_compact_check = 0
+
         try:
             if await self.memory_manager.should_compress():
                 await self.memory_manager.compress_memory()
@@ -193,8 +300,7 @@ Cycle: {state.cycle_count}
                         system_msg = msg
                         break
                 if system_msg is None:
-                    system_prompt = build_system_prompt(self.agent.personality_prompt)
-                    system_msg = SystemMessage(content=system_prompt)
+                    system_msg = self._system_message
 
                 notice = (
                     "Context notice: Previous conversation history was pruned to preserve the "
@@ -217,16 +323,51 @@ Cycle: {state.cycle_count}
         except Exception as e:
             state.error_context += f"\nMemory compaction error: {str(e)}"
 
+    def _trim_window(self, messages: List[BaseMessage], keep_last: int) -> List[BaseMessage]:
+        """Keep the system prefix and the most recent messages, replacing the middle with a notice.
+
+        The window never starts on a ToolMessage, so every kept ToolMessage still follows
+        the assistant message carrying its tool_call. Dropped turns are not lost: they are
+        already persisted to working memory, which every new context message includes.
+        """
+        prefix_len = 2
+        start = len(messages) - keep_last
+        if start <= prefix_len + 1:
+            return messages
+
+        while start < len(messages) and isinstance(messages[start], ToolMessage):
+            start += 1
+
+        notice = HumanMessage(
+            content=(
+                "Context notice: Earlier messages were omitted to bound the context window. "
+                "Their outcomes are summarized in your memory context."
+            )
+        )
+        return messages[:prefix_len] + [notice] + messages[start:]
+
+    def _fit_context_budget(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Halve the message window until the prompt fits the context budget"""
+        budget = int(
+            self.memory_manager.model_config.max_context_tokens * self.CONTEXT_BUDGET_FRACTION
+        )
+        keep_last = self.MESSAGE_WINDOW_SIZE
+        # Rough chars/4 estimate; precise tokenization of the full history would cost more
+        while sum(len(str(m.content)) for m in messages) // 4 > budget and keep_last > 2:
+            keep_last //= 2
+            messages = self._trim_window(messages, keep_last=keep_last)
+        return messages
+
     async def think_node(self, state: AgentState) -> AgentState:
         """Main thinking/decision node using native tool calling"""
         # set context for think node
         await self.append_think_context_to_state_messages(state)
 
-        # Bind tools to the LLM for native tool calling
-        llm_with_tools = self.llm.bind_tools(self.tools_list)
+        # Shrink the window further if the prompt nears the model's context budget
+        state.messages = self._fit_context_budget(state.messages)
 
         # Get response with potential tool calls
-        response = await llm_with_tools.ainvoke(state.messages)
+        response = await self.llm_with_tools.ainvoke(state.messages)
 
         # Store the full AI response in state (includes tool calls)
         state.messages.append(response)
@@ -236,6 +377,12 @@ Cycle: {state.cycle_count}
             response.tool_calls if hasattr(response, "tool_calls") and response.tool_calls else []
         )
 
+        state.dirty = bool(response.content or state.pending_tool_calls)
+        if state.pending_tool_calls or state.pending_tweets:
+            self._idle_cycles = 0
+        else:
+            self._idle_cycles += 1
+
         # Store reasoning if present
         if response.content:
             thought_info = await create_thought_safe(
@@ -250,16 +397,78 @@ Cycle: {state.cycle_count}
             state.thoughts.append(thought_info)
 
             # Persist key reasoning to working memory for continuity
-            await self.memory_manager.add_to_memory([(AgentThoughtType.THINKING, response.content)])
+            await self._add_to_memory([(AgentThoughtType.THINKING, response.content)])
 
         # Compact memory after thinking if needed, but ONLY if there are no pending tool calls.
         # If we compact while tool calls are pending, we risk pruning the assistant
         # message that contains tool_calls, which would invalidate subsequent ToolMessages.
-        if not state.pending_tool_calls:
+        # Idle cycles added nothing to memory, so there is nothing to compact.
+        if state.dirty and not state.pending_tool_calls:
             await self.compact_if_needed(state)
 
+        # Bound prompt growth between compactions
+        state.messages = self._trim_window(state.messages, keep_last=self.MESSAGE_WINDOW_SIZE)
+
         return state
 
+    async def _invoke_tool(self, tool_call: Dict[str, Any]) -> str:
+        """Run a single tool call and return its result serialized for a ToolMessage"""
+        tool_name = tool_call["name"]
+        if tool_name not in self.tools_map:
+            raise ValueError(f"Unknown tool: {tool_name}")
+
+        # Read-only tools called again with the same arguments reuse a very recent result
+        cache_key = None
+        if tool_name in READ_ONLY_TOOL_NAMES:
+            args_key = orjson.dumps(
+                tool_call["args"], default=str, option=orjson.OPT_SORT_KEYS
+            ).decode()
+            cache_key = f"{tool_name}:{args_key}"
+            cached = self._tool_result_cache.get(cache_key)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+        generation = self._tool_cache_generation
+
+        try:
+            async with self._tool_semaphore:
+                result = await self.tools_map[tool_name](**tool_call["args"])
+        finally:
+            if cache_key is None:
+                # Orders and posts change what the read-only tools would return
+                self._tool_cache_generation += 1
+                self._tool_result_cache.clear()
+
+        # Convert result to dict/string for ToolMessage
+        if hasattr(result, "model_dump_json"):
+            # Encode straight to JSON in pydantic-core without building a dict first
+            result_str = result.model_dump_json()
+        elif hasattr(result, "dict"):
+            result_str = _dumps_tool_json(result.dict())
+        elif isinstance(result, dict):
+            result_str = _dumps_tool_json(result)
+        else:
+            result_str = str(result)
+
+        # Only cache successful lookups so transient failures are retried
+        if (
+            cache_key
+            and generation == self._tool_cache_generation
+            and getattr(result, "success", False)
+        ):
+            self._cache_tool_result(cache_key, result_str)
+        return result_str
+
+    def _cache_tool_result(self, cache_key: str, result_str: str) -> None:
+        """Store a tool result with a short TTL, evicting expired entries when full"""
+        now = time.monotonic()
+        if len(self._tool_result_cache) >= self.TOOL_RESULT_CACHE_MAX_ENTRIES:
+            self._tool_result_cache = {
+                key: entry for key, entry in self._tool_result_cache.items() if entry[0] > now
+            }
+            if len(self._tool_result_cache) >= self.TOOL_RESULT_CACHE_MAX_ENTRIES:
+                self._tool_result_cache.clear()
+        self._tool_result_cache[cache_key] = (now + self.TOOL_RESULT_CACHE_TTL_SECONDS, result_str)
+
     async def execute_tools_node(self, state: AgentState) -> AgentState:
         """Execute native OpenAI tool calls and add results as ToolMessages"""
         if not state.pending_tool_calls:
@@ -279,92 +488,65 @@ Cycle: {state.cycle_count}
             state.pending_tool_calls = []
             return state
 
-        for tool_call in state.pending_tool_calls:
-            tool_name = tool_call["name"]
-            tool_id = tool_call["id"]
-            arguments = tool_call["args"]
-
-            try:
-                if tool_name not in self.tools_map:
-                    raise ValueError(f"Unknown tool: {tool_name}")
-
-                # Guard before each individual tool execution as well
-                agent = await get_agent_safe(self.agent.agent_id)
-                if not agent.is_active:
-                    state.is_active = False
-                    break
-
-                # Execute the tool
-                tool_thought = await create_thought_safe(
+        # Record every known tool call as a pending thought in a single transaction
+        tool_calls = state.pending_tool_calls
+        args_strs = [_dumps_tool_json(tool_call["args"]) for tool_call in tool_calls]
+        known_indices = [i for i, tc in enumerate(tool_calls) if tc["name"] in self.tools_map]
+        pending_thoughts = await create_thoughts_safe(
+            [
+                ThoughtCreate(
                     agent_id=self.agent.agent_id,
                     step_number=state.cycle_count,
                     thought_type=AgentThoughtType.TOOL_CALL,
                     content="",
-                    tool_name=AgentToolName(tool_name),
-                    tool_args=json.dumps(arguments, default=str),
-                    tool_result=None,
-                )
-                result = await self.tools_map[tool_name](**arguments)
-
-                # Convert result to dict/string for ToolMessage
-                if hasattr(result, "model_dump"):
-                    result_str = json.dumps(result.model_dump(), default=str)
-                elif hasattr(result, "dict"):
-                    result_str = json.dumps(result.dict(), default=str)
-                elif isinstance(result, dict):
-                    result_str = json.dumps(result, default=str)
-                else:
-                    result_str = str(result)
-
-                # Add tool result as ToolMessage
-                tool_message = ToolMessage(
-                    content=result_str,
-                    tool_call_id=tool_id,
+                    tool_name=AgentToolName(tool_calls[i]["name"]),
+                    tool_args=args_strs[i],
                 )
-                state.messages.append(tool_message)
+                for i in known_indices
+            ]
+        )
+        thought_ids = {i: t.thought_id for i, t in zip(known_indices, pending_thoughts)}
 
-                # Record all tool calls as thoughts
-                tool_thought = await update_thought_with_result_safe(
-                    thought_id=tool_thought.thought_id,
-                    result=result_str,
-                )
-                state.thoughts.append(tool_thought)
-
-                # Persist tool outcome to working memory for continuity
-                await self.memory_manager.add_to_memory(
-                    [
-                        (
-                            AgentThoughtType.TOOL_CALL,
-                            f"{tool_name} args={json.dumps(arguments, default=str)} result={result_str}",
-                        )
-                    ]
-                )
+        # Tool calls from one response are independent, so run them concurrently;
+        # gather preserves order so ToolMessages line up with the assistant's tool_calls
+        outcomes = await asyncio.gather(
+            *(self._invoke_tool(tool_call) for tool_call in tool_calls),
+            return_exceptions=True,
+        )
 
-            except Exception as e:
-                # Create error message as ToolMessage
-                error_message = ToolMessage(
-                    content=f"Error executing {tool_name}: {str(e)}",
-                    tool_call_id=tool_id,
-                )
-                state.messages.append(error_message)
+        thought_results: List[tuple[UUID, str]] = []
+        memory_entries: List[tuple[AgentThoughtType, str]] = []
+        for index, (tool_call, outcome) in enumerate(zip(tool_calls, outcomes)):
+            tool_name = tool_call["name"]
 
-                # Log error as thought
-                error_thought = await update_thought_with_result_safe(
-                    thought_id=tool_thought.thought_id,
-                    result=f"Error with {tool_name}: {str(e)}",
+            if isinstance(outcome, BaseException):
+                # Create error message as ToolMessage
+                content = f"Error executing {tool_name}: {str(outcome)}"
+                thought_result = f"Error with {tool_name}: {str(outcome)}"
+                memory_entry = (
+                    AgentThoughtType.ERROR,
+                    f"{tool_name} failed with error: {str(outcome)}",
                 )
-                state.thoughts.append(error_thought)
-
-                # Persist error to working memory
-                await self.memory_manager.add_to_memory(
-                    [
-                        (
-                            AgentThoughtType.ERROR,
-                            f"{tool_name} failed with error: {str(e)}",
-                        )
-                    ]
+            else:
+                content = outcome
+                thought_result = outcome
+                memory_entry = (
+                    AgentThoughtType.TOOL_CALL,
+                    f"{tool_name} args={args_strs[index]} result={outcome}",
                 )
 
+            state.messages.append(ToolMessage(content=content, tool_call_id=tool_call["id"]))
+            memory_entries.append(memory_entry)
+            if index in thought_ids:
+                thought_results.append((thought_ids[index], thought_result))
+
+        # Record all tool outcomes as thoughts
+        state.thoughts.extend(await update_thoughts_with_results_safe(thought_results))
+
+        # Persist tool outcomes to working memory for continuity
+        if memory_entries:
+            await self._add_to_memory(memory_entries)
+
         # Clear pending tool calls after processing
         state.pending_tool_calls = []
 
@@ -381,8 +563,8 @@ Cycle: {state.cycle_count}
 
     def route_from_think(self, state: AgentState) -> str:
         """Route from think node based on whether there are tool calls"""
-        # TODO add check to compact memory if it reaches 80% of max tokens for the agent's model
-        if state.pending_tool_calls:
+        # Idle cycles skip straight back to the activity check
+        if state.dirty and state.pending_tool_calls:
             return "execute"
         else:
             return "check_active"  # Re-check active state between thoughts
@@ -400,10 +582,24 @@ Cycle: {state.cycle_count}
 
         try:
             while self.running:
-                # Run one cycle through the graph with a higher recursion limit
-                result = await self.graph.ainvoke(
-                    state, config={"recursion_limit": self.MAX_RECURSION_LIMIT}
-                )
+                # Stream the graph with a higher recursion limit. It loops through
+                # check_active -> think -> execute_tools on its own, so one run drives
+                # continuous execution and stop() is honoured between steps.
+                result = None
+                async with aclosing(
+                    self.graph.astream(
+                        state,
+                        config={"recursion_limit": self.MAX_RECURSION_LIMIT},
+                        stream_mode="values",
+                    )
+                ) as stream:
+                    async for values in stream:
+                        result = values
+                        if not self.running:
+                            break
+
+                if result is None or not self.running:
+                    break
 
                 # Update state for next iteration
                 state = AgentState(**result)
@@ -414,9 +610,6 @@ Cycle: {state.cycle_count}
                     self.running = False
                     break
 
-                # Small delay between cycles
-                await asyncio.sleep(1)
-
         except Exception as e:
             print(f"Agent {self.agent.name} error: {e}")
             raise
@@ -8,10 +8,11 @@ from typing import List, Optional
 from uuid import UUID
 
 from database import async_session
-from database.repositories import AgentRepository, XDataRepository
+from database.repositories import AgentRepository
 from enums import AgentThoughtType, AgentToolName
-from models.schemas.agents import Agent, ThoughtInfo
+from models.schemas.agents import Agent, ThoughtCreate, ThoughtInfo
 from models.schemas.tweet_feed import TweetForAgent
+from services.agents.tweet_feed import shared_tweet_feed
 
 
 async def get_agent_safe(agent_id: UUID) -> Agent:
@@ -53,18 +54,6 @@ async def get_active_agents_safe() -> List[Agent]:
         return agents
 
 
-async def get_tweets_safe(after_timestamp: Optional[datetime], limit: int) -> List[TweetForAgent]:
-    """
-    Get tweets with proper session handling.
-    Creates and closes session within this function.
-    """
-    async with async_session() as session:
-        repo = XDataRepository(session)
-        tweets = await repo.get_tweets_for_agent(after_timestamp, limit)
-        # Return the tweets - they're detached from session after context exits
-        return tweets
-
-
 async def update_last_processed_tweet_safe(agent_id: UUID, timestamp: datetime) -> None:
     """
     Update last processed tweet timestamp with proper session handling.
@@ -76,6 +65,26 @@ async def update_last_processed_tweet_safe(agent_id: UUID, timestamp: datetime)
         await session.commit()
 
 
+async def get_agent_and_new_tweets_safe(
+    agent_id: UUID, fetch_tweets: bool, tweet_limit: int
+) -> tuple[Agent, List[TweetForAgent]]:
+    """
+    Get the agent and, optionally, tweets fetched since it last processed any,
+    advancing its last processed timestamp. The tweet feed is read outside any
+    transaction, so no pooled connection sits idle while the feed refreshes.
+    """
+    agent = await get_agent_safe(agent_id)
+    if not fetch_tweets:
+        return agent, []
+
+    # Served from the feed shared by all agents rather than a per-agent query
+    tweets = await shared_tweet_feed.get_tweets_after(agent.last_processed_tweet_at, tweet_limit)
+    if tweets:
+        # Tweets come back ordered by fetched_at, so the last one is the newest
+        await update_last_processed_tweet_safe(agent_id, tweets[-1].fetched_at)
+    return agent, tweets
+
+
 async def create_thought_safe(
     agent_id: UUID,
     step_number: int,
@@ -104,13 +113,29 @@ async def create_thought_safe(
         return thought_info
 
 
-async def update_thought_with_result_safe(thought_id: UUID, result: str) -> ThoughtInfo:
+async def create_thoughts_safe(thoughts: List[ThoughtCreate]) -> List[ThoughtInfo]:
+    """
+    Create several thoughts in one transaction, returned in submission order.
+    Creates its own transaction context.
+    """
+    if not thoughts:
+        return []
+    async with async_session() as session:
+        repo = AgentRepository(session)
+        thought_infos = await repo.create_thoughts_without_commit(thoughts)
+        await session.commit()
+        return thought_infos
+
+
+async def update_thoughts_with_results_safe(results: List[tuple[UUID, str]]) -> List[ThoughtInfo]:
     """
-    Update a thought with a result with proper session handling.
+    Update several thoughts with their results in one transaction.
     Creates its own transaction context.
     """
+    if not results:
+        return []
     async with async_session() as session:
         repo = AgentRepository(session)
-        thought = await repo.update_thought_with_result_without_commit(thought_id, result)
+        thought_infos = await repo.update_thoughts_with_results_without_commit(results)
         await session.commit()
-        return thought
+        return thought_infos
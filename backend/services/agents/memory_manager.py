@@ -2,10 +2,15 @@
 Memory management for AI agents with compression
 """
 
+import asyncio
+import functools
+import hashlib
+from collections import OrderedDict
 from typing import List, Optional
 
 import tiktoken
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 
 from database import async_session
 from database.repositories import AgentRepository
@@ -14,35 +19,89 @@ from models.schemas.agents import Agent, AgentMemoryState, MemoryInfo
 from models.schemas.model_config import ModelProvider, ModelRegistry
 from services.agents.utils import create_llm
 
+# Texts longer than this are tokenized in a worker thread so encoding doesn't block the loop
+THREADED_TOKENIZE_MIN_CHARS = 2000
+# Working-memory appends between full re-encodes of the whole memory
+TOKEN_RESYNC_INTERVAL = 20
+# Approximate tokens for the blank-line separator between memory entries
+JOIN_TOKEN_OVERHEAD = 1
+# Responses are only reused for low-temperature models, where they are near-deterministic
+LLM_CACHE_MAX_TEMPERATURE = 0.3
+LLM_CACHE_MAX_ENTRIES = 1024
+
+# Process-wide LRU of memory LLM responses keyed by model + prompt hash
+_llm_response_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+@functools.lru_cache(maxsize=4)
+def _get_shared_encoder(name: str) -> tiktoken.Encoding:
+    """Load a tiktoken encoding once per process and share it across all agents"""
+    return tiktoken.get_encoding(name)
+
 
 class MemoryManager:
     """Manages agent memory with compression at a fixed token threshold"""
 
-    def __init__(self, agent: Agent):
+    def __init__(self, agent: Agent, llm: Optional[BaseChatModel] = None):
         self.agent_id = agent.agent_id
         self.llm_model = agent.llm_model
         self.model_config = ModelRegistry.get(self.llm_model)
         # Use a fixed token threshold to trigger compaction much earlier
         self.compression_threshold = 10_000
-        self.llm = create_llm(self.llm_model, agent.temperature)
+        # Reuse the owning agent's client when provided instead of opening a second one
+        self.llm = llm if llm is not None else create_llm(self.llm_model, agent.temperature)
+        self.temperature = agent.temperature
         self.encoder = self._get_encoder()
+        self._appends_since_token_resync = 0
+        # Formatted prompt memory, reset whenever this manager writes memory
+        self._formatted_memory_cache: Optional[str] = None
 
     def _get_encoder(self):
         """Get appropriate tokenizer for the model"""
         if self.model_config.provider == ModelProvider.OPENAI:
             # Use cl100k_base for GPT-4/GPT-5 models
-            return tiktoken.get_encoding("cl100k_base")
+            return _get_shared_encoder("cl100k_base")
         elif self.model_config.provider == ModelProvider.ANTHROPIC:
             # Claude uses a similar tokenizer, approximate with cl100k_base
-            return tiktoken.get_encoding("cl100k_base")
+            return _get_shared_encoder("cl100k_base")
         else:
             # xAI/Grok also similar to GPT
-            return tiktoken.get_encoding("cl100k_base")
+            return _get_shared_encoder("cl100k_base")
 
     def count_tokens(self, text: str) -> int:
         """Count tokens in text"""
         return len(self.encoder.encode(text))
 
+    async def count_tokens_async(self, text: str) -> int:
+        """Count tokens in text, off the event loop for large inputs"""
+        if len(text) < THREADED_TOKENIZE_MIN_CHARS:
+            return self.count_tokens(text)
+        return await asyncio.to_thread(self.count_tokens, text)
+
+    async def _ainvoke_cached(self, messages: List[BaseMessage]) -> str:
+        """Invoke the LLM, reusing a previous response for an identical prompt"""
+        if self.temperature > LLM_CACHE_MAX_TEMPERATURE:
+            response = await self.llm.ainvoke(messages)
+            return str(response.content)
+
+        digest = hashlib.sha256()
+        digest.update(self.llm_model.value.encode())
+        for message in messages:
+            digest.update(b"\x00" + str(message.content).encode())
+        key = digest.hexdigest()
+
+        cached = _llm_response_cache.get(key)
+        if cached is not None:
+            _llm_response_cache.move_to_end(key)
+            return cached
+
+        response = await self.llm.ainvoke(messages)
+        content = str(response.content)
+        _llm_response_cache[key] = content
+        if len(_llm_response_cache) > LLM_CACHE_MAX_ENTRIES:
+            _llm_response_cache.popitem(last=False)
+        return content
+
     async def get_memory_state(self) -> AgentMemoryState:
         """Get current memory state"""
         async with async_session() as session:
@@ -72,8 +131,15 @@ class MemoryManager:
         else:
             updated_content = new_content
 
-        # Count tokens
-        token_count = self.count_tokens(updated_content)
+        # Count tokens: only encode the appended chunk, with a periodic full recount
+        # to correct the small drift at join boundaries
+        self._appends_since_token_resync += 1
+        if state.working_memory and self._appends_since_token_resync < TOKEN_RESYNC_INTERVAL:
+            delta_tokens = await self.count_tokens_async(new_content)
+            token_count = state.working_memory.token_count + delta_tokens + JOIN_TOKEN_OVERHEAD
+        else:
+            token_count = await self.count_tokens_async(updated_content)
+            self._appends_since_token_resync = 0
 
         # Save to database
         async with async_session() as session:
@@ -86,6 +152,9 @@ class MemoryManager:
             )
             await session.commit()
 
+        # Memory changed; rebuild the prompt section on next use
+        self._formatted_memory_cache = None
+
     async def compress_memory(self):
         """Compress working memory into compressed memory"""
         state = await self.get_memory_state()
@@ -118,30 +187,20 @@ Create a concise summary that preserves critical trading insights and patterns."
         ]
 
         # Compress using LLM
-        response = await self.llm.ainvoke(messages)
-        compressed_content = response.content
-        compressed_tokens = self.count_tokens(compressed_content)
+        compressed_content = await self._ainvoke_cached(messages)
+        compressed_tokens = await self.count_tokens_async(compressed_content)
 
         # Save compressed memory and clear working memory
         async with async_session() as session:
             repo = AgentRepository(session)
 
-            # Save new compressed memory
-            await repo.save_memory_without_commit(
+            # Save new compressed memory and clear working memory together
+            await repo.save_compressed_memory_without_commit(
                 agent_id=self.agent_id,
-                memory_type=AgentMemoryType.COMPRESSED,
                 content=compressed_content,
                 token_count=compressed_tokens,
             )
 
-            # Clear working memory by saving empty
-            await repo.save_memory_without_commit(
-                agent_id=self.agent_id,
-                memory_type=AgentMemoryType.WORKING,
-                content="",
-                token_count=0,
-            )
-
             # Clean up old compressed memories if too many
             await repo.cleanup_old_memories_without_commit(
                 agent_id=self.agent_id,
@@ -150,6 +209,9 @@ Create a concise summary that preserves critical trading insights and patterns."
 
             await session.commit()
 
+        # Memory changed; rebuild the prompt section on next use
+        self._formatted_memory_cache = None
+
     def _format_compressed_memories(self, memories: List[MemoryInfo]) -> str:
         """Format compressed memories for context"""
         if not memories:
@@ -163,6 +225,9 @@ Create a concise summary that preserves critical trading insights and patterns."
 
     async def get_formatted_memory_for_prompt(self) -> str:
         """Get formatted memory for including in agent prompts"""
+        if self._formatted_memory_cache is not None:
+            return self._formatted_memory_cache
+
         state = await self.get_memory_state()
 
         sections = []
@@ -178,7 +243,10 @@ Create a concise summary that preserves critical trading insights and patterns."
                 compressed_summary += f"\n{memory.content}"
             sections.append(compressed_summary)
 
-        return "\n\n---\n\n".join(sections) if sections else "No memory available."
+        self._formatted_memory_cache = (
+            "\n\n---\n\n".join(sections) if sections else "No memory available."
+        )
+        return self._formatted_memory_cache
 
     async def extract_insights(self) -> Optional[str]:
         """Extract trading insights from all memories"""
@@ -206,8 +274,8 @@ Provide actionable insights for future trading decisions."""
             HumanMessage(content=insight_prompt),
         ]
 
-        response = await self.llm.ainvoke(messages)
-        insights = str(response.content)
+        insights = await self._ainvoke_cached(messages)
+        insights_tokens = await self.count_tokens_async(insights)
 
         # Save as INSIGHTS type memory
         async with async_session() as session:
@@ -216,8 +284,11 @@ Provide actionable insights for future trading decisions."""
                 agent_id=self.agent_id,
                 memory_type=AgentMemoryType.INSIGHTS,
                 content=insights,
-                token_count=self.count_tokens(insights),
+                token_count=insights_tokens,
             )
             await session.commit()
 
+        # Memory changed; rebuild the prompt section on next use
+        self._formatted_memory_cache = None
+
         return insights
@@ -3,45 +3,84 @@ Lightweight wrappers to apply provider-scoped rate limiting and retries
 around LangChain chat models and runnables without mutating underlying instances.
 """
 
-from typing import Any
+import asyncio
+from typing import Any, Dict, Optional
 
 from enums import ModelProvider
-from services.agents.rate_limiter import call_with_limits
+from services.agents.rate_limiter import (
+    ProviderLimiterRegistry,
+    call_with_limits,
+    stream_with_limits,
+)
+
+# In-flight ainvoke calls shared by every coalescing wrapper, keyed by scope + payload
+_inflight: Dict[str, "asyncio.Future[Any]"] = {}
+# Handed to followers when the leading call was cancelled, so they call for themselves
+_RETRY_ALONE = object()
 
 
 class RateLimitedRunnable:
     def __init__(self, provider: ModelProvider, runnable: Any):
         self._provider = provider
         self._runnable = runnable
+        # Provider is fixed per wrapper, so resolve its limiter once
+        self._limiter = ProviderLimiterRegistry.get_limiter(provider)
 
     async def ainvoke(self, *args, **kwargs):
-        return await call_with_limits(
-            self._provider, lambda: self._runnable.ainvoke(*args, **kwargs)
-        )
+        return await call_with_limits(self._limiter, self._runnable.ainvoke, args, kwargs)
 
-    async def astream(self, *args, **kwargs):
-        return await call_with_limits(
-            self._provider, lambda: self._runnable.astream(*args, **kwargs)
-        )
+    def astream(self, *args, **kwargs):
+        return stream_with_limits(self._limiter, self._runnable.astream, args, kwargs)
 
-    def __getattr__(self, name: str):  # Delegate all other attributes/methods
+    def __getattr__(self, name: str):  # Delegate remaining attributes/methods
         return getattr(self._runnable, name)
 
 
 class RateLimitedLLM:
-    def __init__(self, provider: ModelProvider, llm: Any):
+    def __init__(self, provider: ModelProvider, llm: Any, coalesce_scope: Optional[str] = None):
         self._provider = provider
         self._llm = llm
+        # Identical concurrent ainvoke calls within a scope share one request; only set
+        # for near-deterministic configs where any caller's answer is as good as another's
+        self._coalesce_scope = coalesce_scope
+        # Provider is fixed per wrapper, so resolve its limiter once
+        self._limiter = ProviderLimiterRegistry.get_limiter(provider)
 
     def bind_tools(self, tools):
         runnable = self._llm.bind_tools(tools)
         return RateLimitedRunnable(self._provider, runnable)
 
     async def ainvoke(self, *args, **kwargs):
-        return await call_with_limits(self._provider, lambda: self._llm.ainvoke(*args, **kwargs))
+        if self._coalesce_scope is None:
+            return await call_with_limits(self._limiter, self._llm.ainvoke, args, kwargs)
+
+        key = f"{self._coalesce_scope}\x00{args!r}\x00{sorted(kwargs.items())!r}"
+        pending = _inflight.get(key)
+        if pending is not None:
+            result = await asyncio.shield(pending)
+            if result is not _RETRY_ALONE:
+                return result
+            return await call_with_limits(self._limiter, self._llm.ainvoke, args, kwargs)
+
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        _inflight[key] = future
+        try:
+            result = await call_with_limits(self._limiter, self._llm.ainvoke, args, kwargs)
+        except asyncio.CancelledError:
+            future.set_result(_RETRY_ALONE)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved in case no other caller was waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del _inflight[key]
 
-    async def astream(self, *args, **kwargs):
-        return await call_with_limits(self._provider, lambda: self._llm.astream(*args, **kwargs))
+    def astream(self, *args, **kwargs):
+        return stream_with_limits(self._limiter, self._llm.astream, args, kwargs)
 
-    def __getattr__(self, name: str):  # Delegate all other attributes/methods
+    def __getattr__(self, name: str):  # Delegate remaining attributes/methods
         return getattr(self._llm, name)
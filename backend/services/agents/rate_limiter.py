@@ -9,13 +9,43 @@ transient errors.
 
 import asyncio
 import os
+import random
+import re
 import time
-from contextlib import asynccontextmanager
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager
 from dataclasses import dataclass
-from typing import Any, Awaitable, Callable, Dict, Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import anthropic
+import httpx
+import openai
 
 from enums import ModelProvider
 
+# Structured SDK errors, checked before falling back to message scanning
+_RATE_LIMIT_ERRORS = (openai.RateLimitError, anthropic.RateLimitError)
+_TRANSIENT_ERRORS = (
+    openai.APIConnectionError,  # Includes APITimeoutError
+    openai.InternalServerError,
+    anthropic.APIConnectionError,
+    anthropic.InternalServerError,
+    httpx.TimeoutException,
+    httpx.NetworkError,
+)
+# Fallback markers for retryable errors whose type we don't recognise
+_RATE_LIMIT_RE = re.compile(r"429|rate limit|too many requests", re.IGNORECASE)
+_TRANSIENT_RE = re.compile(
+    r"429|rate limit|too many requests|timeout|temporarily unavailable|connection reset"
+    r"|server error|retry-after",
+    re.IGNORECASE,
+)
+_RETRY_AFTER_MESSAGE_RE = re.compile(
+    r"(?:retry|try again)\D{0,12}?(\d+(?:\.\d+)?)\s*(ms|s|sec|seconds?)?\b", re.IGNORECASE
+)
+
 
 @dataclass
 class ProviderLimits:
@@ -38,161 +68,314 @@ def _env_int(name: str, default: int) -> int:
         return default
 
 
-def _defaults_for_provider(provider: ModelProvider) -> ProviderLimits:
-    if provider == ModelProvider.AZURE_OPENAI:
-        # Conservative defaults for S0 tier
-        return ProviderLimits(
-            max_concurrent=_env_int("LLM_AZURE_MAX_CONCURRENT", 2),
-            requests_per_second=_env_float("LLM_AZURE_RPS", 0.5),
-            burst=_env_int("LLM_AZURE_BURST", 2),
-        )
-    if provider == ModelProvider.OPENAI:
-        return ProviderLimits(
-            max_concurrent=_env_int("LLM_OPENAI_MAX_CONCURRENT", 4),
-            requests_per_second=_env_float("LLM_OPENAI_RPS", 1.0),
-            burst=_env_int("LLM_OPENAI_BURST", 4),
-        )
-    if provider == ModelProvider.ANTHROPIC:
-        return ProviderLimits(
-            max_concurrent=_env_int("LLM_ANTHROPIC_MAX_CONCURRENT", 3),
-            requests_per_second=_env_float("LLM_ANTHROPIC_RPS", 0.8),
-            burst=_env_int("LLM_ANTHROPIC_BURST", 3),
-        )
-    # xAI
-    return ProviderLimits(
+# Environment overrides are read once at import rather than per limiter or retry
+_PROVIDER_DEFAULTS: Dict[ModelProvider, ProviderLimits] = {
+    # Conservative defaults for S0 tier
+    ModelProvider.AZURE_OPENAI: ProviderLimits(
+        max_concurrent=_env_int("LLM_AZURE_MAX_CONCURRENT", 2),
+        requests_per_second=_env_float("LLM_AZURE_RPS", 0.5),
+        burst=_env_int("LLM_AZURE_BURST", 2),
+    ),
+    ModelProvider.OPENAI: ProviderLimits(
+        max_concurrent=_env_int("LLM_OPENAI_MAX_CONCURRENT", 4),
+        requests_per_second=_env_float("LLM_OPENAI_RPS", 1.0),
+        burst=_env_int("LLM_OPENAI_BURST", 4),
+    ),
+    ModelProvider.ANTHROPIC: ProviderLimits(
+        max_concurrent=_env_int("LLM_ANTHROPIC_MAX_CONCURRENT", 3),
+        requests_per_second=_env_float("LLM_ANTHROPIC_RPS", 0.8),
+        burst=_env_int("LLM_ANTHROPIC_BURST", 3),
+    ),
+    ModelProvider.XAI: ProviderLimits(
         max_concurrent=_env_int("LLM_XAI_MAX_CONCURRENT", 2),
         requests_per_second=_env_float("LLM_XAI_RPS", 0.5),
         burst=_env_int("LLM_XAI_BURST", 2),
-    )
+    ),
+}
+
+LLM_MAX_RETRIES = _env_int("LLM_MAX_RETRIES", 5)
+LLM_RETRY_BASE_DELAY = _env_float("LLM_RETRY_BASE_DELAY", 1.0)
+LLM_RETRY_MAX_DELAY = _env_float("LLM_RETRY_MAX_DELAY", 15.0)
+
+# Failures within the window that open a provider's circuit, and how long it stays open
+LLM_CIRCUIT_FAILURE_THRESHOLD = _env_int("LLM_CIRCUIT_FAILURE_THRESHOLD", 10)
+LLM_CIRCUIT_WINDOW_SECONDS = _env_float("LLM_CIRCUIT_WINDOW_SECONDS", 60.0)
+LLM_CIRCUIT_COOLDOWN_SECONDS = _env_float("LLM_CIRCUIT_COOLDOWN_SECONDS", 30.0)
+
+
+class ProviderUnavailableError(Exception):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+
+def _defaults_for_provider(provider: ModelProvider) -> ProviderLimits:
+    return _PROVIDER_DEFAULTS.get(provider, _PROVIDER_DEFAULTS[ModelProvider.XAI])
 
 
 class AsyncRateLimiter:
     """Simple async rate limiter combining concurrency and RPS pacing."""
 
+    # Tokens are tracked in thousandths so the bucket math stays in integers
+    _TOKEN = 1000
+    _NS_PER_SECOND = 1_000_000_000
+
     def __init__(self, limits: ProviderLimits):
         self._limits = limits
-        self._semaphore = asyncio.Semaphore(limits.max_concurrent)
-        self._lock = asyncio.Lock()
-        self._allowance = float(limits.burst)
-        self._last_check = time.monotonic()
+        # max_concurrent <= 0 leaves concurrency to RPS pacing alone, skipping the semaphore
+        self._semaphore = (
+            asyncio.Semaphore(limits.max_concurrent) if limits.max_concurrent > 0 else None
+        )
+        self._burst_milli = limits.burst * self._TOKEN
+        self._rps_milli = max(int(limits.requests_per_second * self._TOKEN), 1)
+        self._allowance_milli = self._burst_milli
+        self._last_check_ns = time.monotonic_ns()
+        # Set when any caller is rate limited so new calls hold off instead of re-hitting it
+        self._blocked_until_ns = 0
+        # Circuit breaker: recent failure times, and when calls may resume once tripped
+        self._recent_failures_ns: Deque[int] = deque(maxlen=max(LLM_CIRCUIT_FAILURE_THRESHOLD, 1))
+        self._open_until_ns = 0
+
+    def penalize(self, delay: float) -> None:
+        """Hold off new requests for this provider for at least `delay` seconds."""
+        until_ns = time.monotonic_ns() + int(delay * self._NS_PER_SECOND)
+        self._blocked_until_ns = max(self._blocked_until_ns, until_ns)
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit if too many land within the window."""
+        now_ns = time.monotonic_ns()
+        self._recent_failures_ns.append(now_ns)
+        window_start_ns = now_ns - int(LLM_CIRCUIT_WINDOW_SECONDS * self._NS_PER_SECOND)
+        if (
+            len(self._recent_failures_ns) == self._recent_failures_ns.maxlen
+            and self._recent_failures_ns[0] >= window_start_ns
+        ):
+            self._open_until_ns = now_ns + int(LLM_CIRCUIT_COOLDOWN_SECONDS * self._NS_PER_SECOND)
+            self._recent_failures_ns.clear()
+
+    def _refill(self) -> None:
+        now_ns = time.monotonic_ns()
+        added = (now_ns - self._last_check_ns) * self._rps_milli // self._NS_PER_SECOND
+        if added:
+            # Only advance the clock by whole units so sub-unit time isn't lost
+            self._allowance_milli = min(self._burst_milli, self._allowance_milli + added)
+            self._last_check_ns = now_ns
 
     async def _consume_token(self) -> None:
-        # Token bucket refill
-        async with self._lock:
-            current = time.monotonic()
-            elapsed = current - self._last_check
-            self._last_check = current
-            self._allowance += elapsed * self._limits.requests_per_second
-            if self._allowance > self._limits.burst:
-                self._allowance = float(self._limits.burst)
+        while True:
+            # No lock needed: the loop is single-threaded and nothing below awaits
+            # until the sleep, so refill-and-take can't interleave with another caller
+            now_ns = time.monotonic_ns()
+            if now_ns < self._open_until_ns:
+                remaining = (self._open_until_ns - now_ns) / self._NS_PER_SECOND
+                raise ProviderUnavailableError(
+                    f"LLM provider circuit open after repeated failures; retry in {remaining:.0f}s"
+                )
+            if now_ns < self._blocked_until_ns:
+                await asyncio.sleep((self._blocked_until_ns - now_ns) / self._NS_PER_SECOND)
+                continue
+
+            self._refill()
+            if self._allowance_milli >= self._TOKEN:
+                self._allowance_milli -= self._TOKEN
+                return
+            needed = self._TOKEN - self._allowance_milli
+            sleep_ns = needed * self._NS_PER_SECOND // self._rps_milli
 
             # Wait until a token becomes available
-            while self._allowance < 1.0:
-                needed = 1.0 - self._allowance
-                sleep_for = needed / max(self._limits.requests_per_second, 0.0001)
-                await asyncio.sleep(min(sleep_for, 1.0))
-                current2 = time.monotonic()
-                elapsed2 = current2 - self._last_check
-                self._last_check = current2
-                self._allowance += elapsed2 * self._limits.requests_per_second
-                if self._allowance > self._limits.burst:
-                    self._allowance = float(self._limits.burst)
-
-            self._allowance -= 1.0
+            await asyncio.sleep(min(sleep_ns, self._NS_PER_SECOND) / self._NS_PER_SECOND)
 
     @asynccontextmanager
     async def throttle(self):
-        await self._semaphore.acquire()
-        try:
+        if self._semaphore is None:
             await self._consume_token()
             yield
-        finally:
-            self._semaphore.release()
+        else:
+            async with self._semaphore:
+                await self._consume_token()
+                yield
+
+
+# One limiter per provider, built at import so every caller shares the same instance
+_LIMITERS: Dict[ModelProvider, AsyncRateLimiter] = {
+    provider: AsyncRateLimiter(_defaults_for_provider(provider)) for provider in ModelProvider
+}
 
 
 class ProviderLimiterRegistry:
     """Singleton-like registry of limiters per provider."""
 
-    _limiters: Dict[ModelProvider, AsyncRateLimiter] = {}
-
     @classmethod
     def get_limiter(cls, provider: ModelProvider) -> AsyncRateLimiter:
-        if provider not in cls._limiters:
-            cls._limiters[provider] = AsyncRateLimiter(_defaults_for_provider(provider))
-        return cls._limiters[provider]
+        return _LIMITERS[provider]
+
+
+def _parse_retry_after(e: Exception, message: Optional[str] = None) -> Optional[float]:
+    """Seconds the provider asked us to wait, from headers, the SDK, or the message."""
+    response = getattr(e, "response", None)
+    if isinstance(response, httpx.Response):
+        headers = response.headers
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except (KeyError, ValueError):
+            pass
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+            # Retry-After may also be an HTTP date
+            try:
+                retry_at = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                pass
+            else:
+                if retry_at.tzinfo is None:
+                    retry_at = retry_at.replace(tzinfo=timezone.utc)
+                return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+    retry_after = getattr(e, "retry_after", None)
+    if isinstance(retry_after, (int, float)):
+        return float(retry_after)
+
+    if message is not None:
+        # e.g. "Please retry after 3 seconds", "try again in 1.5s"
+        match = _RETRY_AFTER_MESSAGE_RE.search(message)
+        if match:
+            seconds = float(match.group(1))
+            if match.group(2) and match.group(2).lower() == "ms":
+                seconds /= 1000
+            if 0 < seconds < 120:
+                return seconds
+    return None
+
+
+def _retry_delay_or_raise(
+    e: Exception,
+    attempt: int,
+    limiter: Optional[AsyncRateLimiter],
+    max_retries: int,
+    base_delay: float,
+    max_delay: float,
+) -> float:
+    """Seconds to wait before retrying after `e`, or re-raise it if it isn't retryable.
+
+    Records the failure on the limiter's circuit breaker and, for 429s, pauses
+    every other caller of that provider.
+    """
+    retry_after: Optional[float] = None
+    is_rate_limited = isinstance(e, _RATE_LIMIT_ERRORS)
+
+    if is_rate_limited or isinstance(e, _TRANSIENT_ERRORS):
+        retry_after = _parse_retry_after(e)
+    else:
+        # Unknown types (e.g. re-wrapped by LangChain): fall back to the message
+        message = str(e)
+        if not _TRANSIENT_RE.search(message):
+            raise e
+        is_rate_limited = _RATE_LIMIT_RE.search(message) is not None
+        retry_after = _parse_retry_after(e, message)
+
+    # Rate limits are paced by penalize(); other failures count toward the breaker
+    if limiter is not None and (not is_rate_limited or attempt >= max_retries):
+        limiter.record_failure()
+
+    if attempt >= max_retries:
+        raise e
+
+    delay = min(max_delay, base_delay * (2**attempt))
+    # Jitter so agents throttled together don't all retry at the same instant
+    delay *= 0.5 + random.random() * 0.5
+    if retry_after is not None:
+        delay = max(delay, retry_after * (1.0 + random.random() * 0.25))
+    if is_rate_limited and limiter is not None:
+        limiter.penalize(delay)
+    return delay
 
 
 async def with_retries(
-    func: Callable[[], Awaitable[Any]],
+    func: Callable[..., Awaitable[Any]],
+    args: Tuple[Any, ...] = (),
+    kwargs: Optional[Dict[str, Any]] = None,
     *,
-    max_retries: int = _env_int("LLM_MAX_RETRIES", 5),
-    base_delay: float = _env_float("LLM_RETRY_BASE_DELAY", 1.0),
-    max_delay: float = _env_float("LLM_RETRY_MAX_DELAY", 15.0),
+    limiter: Optional[AsyncRateLimiter] = None,
+    max_retries: int = LLM_MAX_RETRIES,
+    base_delay: float = LLM_RETRY_BASE_DELAY,
+    max_delay: float = LLM_RETRY_MAX_DELAY,
 ) -> Any:
-    """Execute an async callable with exponential backoff on transient errors.
+    """Call `func(*args, **kwargs)` with exponential backoff on transient errors.
 
     Retries on HTTP 429 and common network/transient exceptions. Respects
-    Retry-After header if the exception exposes one (best-effort).
+    Retry-After header if the exception exposes one (best-effort). When a
+    limiter is given, each attempt runs under its throttle and a 429 also
+    pauses every other caller of that provider.
     """
 
+    if kwargs is None:
+        kwargs = {}
+
     attempt = 0
     while True:
         try:
-            return await func()
-        except Exception as e:  # noqa: BLE001 - we re-raise after checks
-            retry_after: Optional[float] = None
-            message = str(e).lower()
-
-            is_rate_limited = "429" in message or "rate limit" in message
-            is_transient = any(
-                substr in message
-                for substr in [
-                    "timeout",
-                    "temporarily unavailable",
-                    "connection reset",
-                    "server error",
-                    "retry-after",
-                    "too many requests",
-                ]
-            )
-
-            # Azure/OpenAI SDKs rarely expose structured Retry-After here; best-effort parse
-            # Example: "Please retry after 3 seconds"
-            for token in message.split():
-                if token.isdigit():
-                    try:
-                        seconds = float(token)
-                        if 0 < seconds < 120:
-                            retry_after = seconds
-                            break
-                    except Exception:
-                        pass
-
-            if not is_rate_limited and not is_transient:
-                raise
-
-            if attempt >= max_retries:
-                raise
-
-            attempt += 1
-            delay = min(max_delay, base_delay * (2 ** (attempt - 1)))
-            if retry_after is not None:
-                delay = max(delay, retry_after)
-            await asyncio.sleep(delay)
-
-            # No early pause; only pause when retries are exhausted
+            if limiter is None:
+                return await func(*args, **kwargs)
+            async with limiter.throttle():
+                return await func(*args, **kwargs)
+        except ProviderUnavailableError:
+            raise
+        except Exception as e:  # noqa: BLE001 - re-raised when not retryable
+            delay = _retry_delay_or_raise(e, attempt, limiter, max_retries, base_delay, max_delay)
+
+        attempt += 1
+        await asyncio.sleep(delay)
 
 
 async def call_with_limits(
-    provider: ModelProvider,
-    coro_factory: Callable[[], Awaitable[Any]],
+    limiter: AsyncRateLimiter,
+    method: Callable[..., Awaitable[Any]],
+    args: Tuple[Any, ...] = (),
+    kwargs: Optional[Dict[str, Any]] = None,
 ) -> Any:
-    """Run an async operation under provider-specific rate limits with retries."""
-
-    limiter = ProviderLimiterRegistry.get_limiter(provider)
-
-    async def _do_call() -> Any:
-        async with limiter.throttle():
-            return await coro_factory()
+    """Run an async method under a provider's rate limiter with retries."""
+    # Arguments are passed through rather than captured in a closure per call
+    return await with_retries(method, args, kwargs, limiter=limiter)
+
+
+async def stream_with_limits(
+    limiter: AsyncRateLimiter,
+    method: Callable[..., AsyncIterator[Any]],
+    args: Tuple[Any, ...] = (),
+    kwargs: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Any]:
+    """Stream from an async-iterator method under a provider's rate limiter.
+
+    Each attempt takes its own throttle slot, held until the stream is consumed.
+    Only opening the stream and receiving its first chunk are retried; a partial
+    response can't be replayed.
+    """
+    if kwargs is None:
+        kwargs = {}
 
-    return await with_retries(_do_call)
+    attempt = 0
+    while True:
+        async with AsyncExitStack() as stack:
+            await stack.enter_async_context(limiter.throttle())
+            stream = method(*args, **kwargs)
+            # Closed on exit, including after a failed first chunk
+            stack.push_async_callback(stream.aclose)
+            try:
+                first = await anext(stream)
+            except StopAsyncIteration:
+                return
+            except Exception as e:  # noqa: BLE001 - re-raised when not retryable
+                delay = _retry_delay_or_raise(
+                    e, attempt, limiter, LLM_MAX_RETRIES, LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY
+                )
+            else:
+                yield first
+                async for chunk in stream:
+                    yield chunk
+                return
+
+        # Back off with the throttle slot released
+        attempt += 1
+        await asyncio.sleep(delay)
@@ -47,20 +47,22 @@ async def _shutdown(
     agent_monitor_task: asyncio.Task,
 ) -> None:
     """Gracefully stop services and cancel background tasks."""
-    # Stop agent manager
-    await agent_manager.stop()
-
-    # Stop expiration service
-    await expiration_service.stop()
+    # Stop agent manager and expiration service; both submit to the order router
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(agent_manager.stop())
+        tg.create_task(expiration_service.stop())
 
     # Shutdown order router
     await order_router.shutdown()
 
     # Cancel background tasks
-    for task in (expiration_task, agent_monitor_task):
-        task.cancel()
-        with suppress(asyncio.CancelledError):
-            await task
+    await asyncio.gather(*(_cancel(task) for task in (expiration_task, agent_monitor_task)))
+
+
+async def _cancel(task: asyncio.Task) -> None:
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
 
 
 async def main() -> None:
@@ -4,17 +4,8 @@ Combines standardized system instructions with personality prompts.
 """
 
 
-def build_system_prompt(personality: str) -> str:
-    """
-    Build complete system prompt from personality.
-
-    Args:
-        personality_prompt: The unique personality/character traits for this agent
-
-    Returns:
-        Complete system prompt with base instructions and personality
-    """
-    base_prompt = """You are an AI trading agent for X-Traders exchange.
+# Shared instructions preceding every agent's personality; built once per process
+_PROMPT_PREFIX = """You are an AI trading agent for X-Traders exchange.
 
 Your goal is to maximize profits by trading X (Twitter) user tokens while managing risk appropriately.
 
@@ -69,6 +60,17 @@ Guidelines:
 15. Maintain healthy market flow: when appropriate, keep small, risk-aware quotes on both sides to facilitate trading and improve your own execution.
 
 Your unique personality and trading style:
-{personality}"""
+"""
 
-    return base_prompt.format(personality=personality)
+
+def build_system_prompt(personality: str) -> str:
+    """
+    Build complete system prompt from personality.
+
+    Args:
+        personality_prompt: The unique personality/character traits for this agent
+
+    Returns:
+        Complete system prompt with base instructions and personality
+    """
+    return _PROMPT_PREFIX + personality
@@ -0,0 +1,91 @@
+"""
+Process-wide tweet feed shared by all agents.
+
+Agents poll for tweets fetched after their own cursor. Instead of each agent
+querying the database, one coalesced query per refresh window keeps an
+in-memory, time-ordered tail of recent tweets that every agent filters locally.
+"""
+
+import asyncio
+import time
+from bisect import bisect_right
+from datetime import datetime
+from typing import List, Optional
+
+from database import async_session
+from database.repositories import XDataRepository
+from models.schemas.tweet_feed import TweetForAgent
+
+
+class SharedTweetFeed:
+    """Coalesces tweet polling across agents into one query per refresh window"""
+
+    REFRESH_INTERVAL_SECONDS = 5.0
+    MAX_CACHED_TWEETS = 1000
+
+    def __init__(self) -> None:
+        self._tweets: List[TweetForAgent] = []  # Ordered by fetched_at ascending
+        self._fetched_ats: List[datetime] = []  # Parallel to _tweets, for bisecting
+        # The cache holds every tweet fetched strictly after this timestamp
+        self._covered_after: Optional[datetime] = None
+        self._last_refresh = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_tweets_after(
+        self, after_timestamp: Optional[datetime], limit: int
+    ) -> List[TweetForAgent]:
+        """Get up to `limit` tweets fetched after the timestamp, oldest first"""
+        if after_timestamp is None:
+            return await self._query(after_timestamp, limit)
+
+        await self._refresh_if_stale(after_timestamp)
+
+        if self._covered_after is None or after_timestamp < self._covered_after:
+            # Older than the shared window; serve this caller directly
+            return await self._query(after_timestamp, limit)
+
+        start = bisect_right(self._fetched_ats, after_timestamp)
+        return self._tweets[start : start + limit]
+
+    async def _refresh_if_stale(self, after_timestamp: datetime) -> None:
+        """Fetch tweets newer than the cached tail, at most once per refresh window"""
+        if time.monotonic() - self._last_refresh < self.REFRESH_INTERVAL_SECONDS:
+            return
+
+        async with self._lock:
+            # Another agent may have refreshed while we waited for the lock
+            if time.monotonic() - self._last_refresh < self.REFRESH_INTERVAL_SECONDS:
+                return
+
+            if self._covered_after is None:
+                # Seed the window from the first caller's cursor
+                self._covered_after = after_timestamp
+
+            newest = self._fetched_ats[-1] if self._fetched_ats else self._covered_after
+            fresh = await self._query(newest, self.MAX_CACHED_TWEETS)
+
+            # Upserts bump fetched_at, so a re-ingested tweet comes back at the tail;
+            # drop its older copy so each tweet is cached once, with current metrics
+            fresh_ids = {t.tweet_id for t in fresh}
+            if any(t.tweet_id in fresh_ids for t in self._tweets):
+                self._tweets = [t for t in self._tweets if t.tweet_id not in fresh_ids]
+                self._fetched_ats = [t.fetched_at for t in self._tweets]
+            self._tweets.extend(fresh)
+            self._fetched_ats.extend(t.fetched_at for t in fresh)
+
+            overflow = len(self._tweets) - self.MAX_CACHED_TWEETS
+            if overflow > 0:
+                self._covered_after = self._fetched_ats[overflow - 1]
+                del self._tweets[:overflow]
+                del self._fetched_ats[:overflow]
+
+            self._last_refresh = time.monotonic()
+
+    async def _query(self, after_timestamp: Optional[datetime], limit: int) -> List[TweetForAgent]:
+        async with async_session() as session:
+            repo = XDataRepository(session)
+            return await repo.get_tweets_for_agent(after_timestamp, limit)
+
+
+# Global shared feed instance
+shared_tweet_feed = SharedTweetFeed()
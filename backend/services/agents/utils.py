@@ -1,3 +1,6 @@
+from typing import Callable, Dict
+
+import httpx
 from langchain_anthropic import ChatAnthropic
 from langchain_core.language_models import BaseChatModel
 from langchain_openai import AzureChatOpenAI, ChatOpenAI
@@ -5,36 +8,64 @@ from langchain_openai import AzureChatOpenAI, ChatOpenAI
 from enums import LLMModel, ModelProvider
 from services.agents.rate_limited_llm import RateLimitedLLM
 
+# One pooled keep-alive client shared by every OpenAI-compatible model so agents reuse
+# TLS connections to the provider instead of each holding its own pool
+shared_async_http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=256, max_keepalive_connections=128),
+    timeout=httpx.Timeout(60.0),
+)
+
+
+def _create_azure_openai(llm_model: LLMModel, temperature: float) -> BaseChatModel:
+    return AzureChatOpenAI(
+        model=llm_model.value,
+        temperature=temperature,
+        api_version=llm_model.get_azure_api_version(),
+        http_async_client=shared_async_http_client,
+    )
+
+
+def _create_openai(llm_model: LLMModel, temperature: float) -> BaseChatModel:
+    return ChatOpenAI(
+        model=llm_model.value,
+        temperature=temperature,
+        http_async_client=shared_async_http_client,
+    )
+
+
+def _create_anthropic(llm_model: LLMModel, temperature: float) -> BaseChatModel:
+    return ChatAnthropic(
+        model=llm_model.value,
+        temperature=temperature,
+    )
+
+
+def _create_xai(llm_model: LLMModel, temperature: float) -> BaseChatModel:
+    return ChatOpenAI(
+        model=llm_model.value,
+        temperature=temperature,
+        base_url="https://api.x.ai/v1",
+        http_async_client=shared_async_http_client,
+    )
+
+
+_PROVIDER_FACTORIES: Dict[ModelProvider, Callable[[LLMModel, float], BaseChatModel]] = {
+    ModelProvider.AZURE_OPENAI: _create_azure_openai,
+    ModelProvider.OPENAI: _create_openai,
+    ModelProvider.ANTHROPIC: _create_anthropic,
+    ModelProvider.XAI: _create_xai,
+}
+
 
 def create_llm(llm_model: LLMModel, temperature: float = 0.3) -> BaseChatModel:
     """Create an LLM based on the model config"""
     provider = llm_model.get_provider()
-    # Create underlying model first
-    match provider:
-        case ModelProvider.AZURE_OPENAI:
-            base_llm = AzureChatOpenAI(
-                model=llm_model.value,
-                temperature=temperature,
-                api_version=llm_model.get_azure_api_version(),
-            )
-        case ModelProvider.OPENAI:
-            base_llm = ChatOpenAI(
-                model=llm_model.value,
-                temperature=temperature,
-            )
-        case ModelProvider.ANTHROPIC:
-            base_llm = ChatAnthropic(
-                model=llm_model.value,
-                temperature=temperature,
-            )
-        case ModelProvider.XAI:
-            base_llm = ChatOpenAI(
-                model=llm_model.value,
-                temperature=temperature,
-                base_url="https://api.x.ai/v1",
-            )
-        case _:
-            raise ValueError(f"Unknown model provider: {provider}")
+    factory = _PROVIDER_FACTORIES.get(provider)
+    if factory is None:
+        raise ValueError(f"Unknown model provider: {provider}")
 
     # Return a lightweight wrapper that applies rate limiting to ainvoke/astream/bind_tools
-    return RateLimitedLLM(provider, base_llm)
+    # Identical concurrent requests share one call only at temperature 0; above that each
+    # caller is owed its own sample
+    coalesce_scope = f"{llm_model.value}:{temperature}" if temperature == 0 else None
+    return RateLimitedLLM(provider, factory(llm_model, temperature), coalesce_scope)
@@ -2,22 +2,38 @@
 Service for backing up and restoring tweet data
 """
 
-import json
+import asyncio
+import io
+import os
+import shutil
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from typing import List, Optional
 
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from database import async_session
+from database.models import XTweet
 from database.repositories import XDataRepository
 from models.schemas.backup import BackupMetadata, BackupStats, BackupTweet, BackupUser, TweetBackup
 from models.schemas.x_api import TweetInfo, UserInfo
 
+BACKUP_WRITE_BUFFER_SIZE = 1024 * 1024
+# On-disk format for new backups: "ndjson" (default) or "parquet" (columnar, needs pyarrow)
+BACKUP_FORMAT = os.getenv("BACKUP_FORMAT", "ndjson")
+BACKUP_SUFFIXES = {"ndjson": ".ndjson", "parquet": ".parquet"}
+# Parquet schema metadata key holding the backup metadata and users
+PARQUET_HEADER_KEY = b"x_traders_backup"
+# Rows per multi-row upsert when importing; tweets use 18 bind params per row
+IMPORT_BATCH_SIZE = 500
+
 
 class BackupService:
     """Service for managing tweet data backups"""
 
-    def __init__(self, backup_dir: Optional[str] = None):
+    def __init__(self, backup_dir: Optional[str] = None, backup_format: Optional[str] = None):
         if backup_dir:
             self.backup_dir = Path(backup_dir)
         else:
@@ -27,16 +43,44 @@ class BackupService:
         # Ensure backup directory exists
         self.backup_dir.mkdir(parents=True, exist_ok=True)
 
-        self.main_backup_file = self.backup_dir / "tweets_backup.json"
+        self.backup_format = backup_format or BACKUP_FORMAT
+        if self.backup_format not in BACKUP_SUFFIXES:
+            raise ValueError(f"Unsupported backup format: {self.backup_format}")
+        self.backup_suffix = BACKUP_SUFFIXES[self.backup_format]
+
+        # NDJSON backups are a header line with metadata and users, then one tweet per line;
+        # Parquet backups hold tweets as columns with the header in the schema metadata
+        self.main_backup_file = self.backup_dir / f"tweets_backup{self.backup_suffix}"
+        # Main files of the other formats, read when the configured one doesn't exist yet;
+        # tweets_backup.json is the single-document format written before NDJSON
+        self._fallback_backup_files = [
+            self.backup_dir / f"tweets_backup{suffix}"
+            for suffix in (*BACKUP_SUFFIXES.values(), ".json")
+            if suffix != self.backup_suffix
+        ]
 
     def _get_timestamped_backup_path(self) -> Path:
         """Generate a timestamped backup filename"""
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-        return self.backup_dir / f"tweets_backup_{timestamp}.json"
+        return self.backup_dir / f"tweets_backup_{timestamp}{self.backup_suffix}"
+
+    def _latest_backup_path(self) -> Path:
+        """Main backup file, falling back to another format's main file if not yet migrated"""
+        if not self.main_backup_file.exists():
+            for path in self._fallback_backup_files:
+                if path.exists():
+                    return path
+        return self.main_backup_file
+
+    def is_main_backup(self, path: Path) -> bool:
+        """Whether a path is a main (non-timestamped) backup file"""
+        return path.name == self.main_backup_file.name or any(
+            path.name == fallback.name for fallback in self._fallback_backup_files
+        )
 
     async def export_from_database(self, session: AsyncSession) -> BackupStats:
         """
-        Export all tweets and users from database to JSON backup.
+        Export all tweets and users from database to a backup file.
         This method only reads data, no commits needed.
 
         Returns:
@@ -47,58 +91,57 @@ class BackupService:
         try:
             repo = XDataRepository(session)
 
-            # Fetch all users using repository
-            db_users = await repo.get_all_users()
+            # Fetch users and tweets concurrently; a session runs one query at a time,
+            # so tweets are read on a second session
+            db_users, db_tweets = await asyncio.gather(
+                repo.get_all_users(), self._get_all_tweets_in_new_session()
+            )
 
-            backup_users = []
+            # Rows come straight from typed database columns, so skip per-row validation
             current_time = datetime.now(timezone.utc)
-            for user in db_users:
-                backup_users.append(
-                    BackupUser(
-                        username=user.username,
-                        name=user.name,
-                        description=user.description,
-                        location=user.location,
-                        num_followers=user.num_followers,
-                        num_following=user.num_following,
-                        fetched_at=current_time,  # Use export time since UserInfo doesn't have fetched_at
-                    )
+            backup_users = [
+                BackupUser.model_construct(
+                    username=user.username,
+                    name=user.name,
+                    description=user.description,
+                    location=user.location,
+                    num_followers=user.num_followers,
+                    num_following=user.num_following,
+                    fetched_at=user.fetched_at,
                 )
+                for user in db_users
+            ]
             stats.users_processed = len(backup_users)
 
-            # Fetch all tweets using repository
-            db_tweets = await repo.get_all_tweets()
-
-            backup_tweets = []
-            for tweet in db_tweets:
-                backup_tweets.append(
-                    BackupTweet(
-                        tweet_id=tweet.tweet_id,
-                        author_username=tweet.author_username,
-                        text=tweet.text,
-                        retweet_count=tweet.retweet_count,
-                        reply_count=tweet.reply_count,
-                        like_count=tweet.like_count,
-                        quote_count=tweet.quote_count,
-                        view_count=tweet.view_count,
-                        bookmark_count=tweet.bookmark_count,
-                        is_reply=tweet.is_reply,
-                        reply_to_tweet_id=tweet.reply_to_tweet_id,
-                        conversation_id=tweet.conversation_id,
-                        in_reply_to_username=tweet.in_reply_to_username,
-                        quoted_tweet_id=tweet.quoted_tweet_id,
-                        retweeted_tweet_id=tweet.retweeted_tweet_id,
-                        entities=tweet.entities,
-                        tweet_created_at=tweet.tweet_created_at,
-                        fetched_at=tweet.fetched_at,
-                    )
+            backup_tweets = [
+                BackupTweet.model_construct(
+                    tweet_id=tweet.tweet_id,
+                    author_username=tweet.author_username,
+                    text=tweet.text,
+                    retweet_count=tweet.retweet_count,
+                    reply_count=tweet.reply_count,
+                    like_count=tweet.like_count,
+                    quote_count=tweet.quote_count,
+                    view_count=tweet.view_count,
+                    bookmark_count=tweet.bookmark_count,
+                    is_reply=tweet.is_reply,
+                    reply_to_tweet_id=tweet.reply_to_tweet_id,
+                    conversation_id=tweet.conversation_id,
+                    in_reply_to_username=tweet.in_reply_to_username,
+                    quoted_tweet_id=tweet.quoted_tweet_id,
+                    retweeted_tweet_id=tweet.retweeted_tweet_id,
+                    entities=tweet.entities,
+                    tweet_created_at=tweet.tweet_created_at,
+                    fetched_at=tweet.fetched_at,
                 )
+                for tweet in db_tweets
+            ]
             stats.tweets_processed = len(backup_tweets)
 
-            # Create backup object
-            backup = TweetBackup(
+            # Create backup document
+            backup = TweetBackup.model_construct(
                 metadata=BackupMetadata(
-                    exported_at=datetime.now(timezone.utc),
+                    exported_at=current_time,
                     ticker_count=len(backup_users),
                     tweet_count=len(backup_tweets),
                     user_count=len(backup_users),
@@ -108,9 +151,10 @@ class BackupService:
                 tweets=backup_tweets,
             )
 
-            # Save to both main and timestamped files
-            self._save_backup(backup, self.main_backup_file)
-            self._save_backup(backup, self._get_timestamped_backup_path())
+            # Save the timestamped file once and point the main file at it
+            snapshot_path = self._get_timestamped_backup_path()
+            self._save_backup(backup, snapshot_path)
+            self._link_main_backup(snapshot_path)
 
             stats.completed_at = datetime.now(timezone.utc)
             stats.success = True
@@ -121,11 +165,15 @@ class BackupService:
 
         return stats
 
+    async def _get_all_tweets_in_new_session(self) -> List[XTweet]:
+        async with async_session() as session:
+            return await XDataRepository(session).get_all_tweets()
+
     async def import_to_database(
         self, session: AsyncSession, backup_file: Optional[Path] = None
     ) -> BackupStats:
         """
-        Import tweets and users from JSON backup to database.
+        Import tweets and users from a backup file to database.
         This method handles the complete transaction including commit.
 
         Args:
@@ -139,7 +187,7 @@ class BackupService:
 
         try:
             # Load backup
-            backup_path = backup_file or self.main_backup_file
+            backup_path = backup_file or self._latest_backup_path()
             if not backup_path.exists():
                 stats.errors.append(f"Backup file not found: {backup_path}")
                 return stats
@@ -149,21 +197,29 @@ class BackupService:
             # Create repository with session
             repo = XDataRepository(session)
 
-            # Import users
+            # Import users in batches of multi-row upserts
+            user_batch: List[UserInfo] = []
             for backup_user in backup.users:
-                user_info = UserInfo(
-                    username=backup_user.username,
-                    name=backup_user.name or "",
-                    description=backup_user.description,
-                    location=backup_user.location,
-                    num_followers=backup_user.num_followers,
-                    num_following=backup_user.num_following,
-                    fetched_at=backup_user.fetched_at,
+                user_batch.append(
+                    UserInfo(
+                        username=backup_user.username,
+                        name=backup_user.name or "",
+                        description=backup_user.description,
+                        location=backup_user.location,
+                        num_followers=backup_user.num_followers,
+                        num_following=backup_user.num_following,
+                        fetched_at=backup_user.fetched_at,
+                    )
                 )
-                await repo.upsert_user_without_commit(user_info)
-                stats.users_processed += 1
+                if len(user_batch) >= IMPORT_BATCH_SIZE:
+                    stats.users_processed += await repo.bulk_upsert_users_without_commit(
+                        user_batch
+                    )
+                    user_batch = []
+            stats.users_processed += await repo.bulk_upsert_users_without_commit(user_batch)
 
-            # Import tweets
+            # Import tweets in batches of multi-row upserts
+            tweet_batch: List[tuple[TweetInfo, str]] = []
             for backup_tweet in backup.tweets:
                 tweet = TweetInfo(
                     tweet_id=backup_tweet.tweet_id,
@@ -183,8 +239,13 @@ class BackupService:
                     retweeted_tweet_id=backup_tweet.retweeted_tweet_id,
                     entities=None,  # Will handle entities separately if needed
                 )
-                await repo.upsert_tweet_without_commit(tweet, backup_tweet.author_username)
-                stats.tweets_processed += 1
+                tweet_batch.append((tweet, backup_tweet.author_username))
+                if len(tweet_batch) >= IMPORT_BATCH_SIZE:
+                    stats.tweets_processed += await repo.bulk_upsert_tweets_without_commit(
+                        tweet_batch
+                    )
+                    tweet_batch = []
+            stats.tweets_processed += await repo.bulk_upsert_tweets_without_commit(tweet_batch)
 
             # Commit all changes
             await session.commit()
@@ -201,47 +262,171 @@ class BackupService:
         return stats
 
     def _save_backup(self, backup: TweetBackup, filepath: Path) -> None:
-        """Save backup to JSON file"""
-        with open(filepath, "w", encoding="utf-8") as f:
-            # Convert to dict with proper datetime serialization
-            backup_dict = backup.model_dump(mode="json")
-            json.dump(backup_dict, f, indent=2, default=str)
+        """Save backup to a file in the format given by its suffix"""
+        # Write to a temporary file and rename it into place, so readers and crashes
+        # never see a truncated backup
+        tmp_path = filepath.with_name(filepath.name + ".tmp")
+        if filepath.suffix == ".parquet":
+            self._write_parquet(backup, tmp_path)
+        else:
+            self._write_ndjson(backup, tmp_path)
+        os.replace(tmp_path, filepath)
+        self._fsync_backup_dir()
+
+    @staticmethod
+    def _dump_header(backup: TweetBackup) -> bytes:
+        """Serialize the metadata and users that precede the tweets in a backup file"""
+        # Python mode keeps datetimes native so orjson formats them like the tweet rows
+        return orjson.dumps(
+            backup.model_dump(include={"metadata", "users"}),
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z,
+        )
+
+    def _write_ndjson(self, backup: TweetBackup, filepath: Path) -> None:
+        option = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE
+        # Unbuffered raw file behind a 1 MiB buffer so per-line writes become few large ones
+        with open(filepath, "wb", buffering=0) as raw:
+            with io.BufferedWriter(raw, buffer_size=BACKUP_WRITE_BUFFER_SIZE) as f:
+                f.write(self._dump_header(backup) + b"\n")
+                for tweet in backup.tweets:
+                    f.write(orjson.dumps(tweet.model_dump(), option=option))
+                f.flush()
+                os.fsync(raw.fileno())
+
+    def _write_parquet(self, backup: TweetBackup, filepath: Path) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = self._parquet_tweet_schema(pa).with_metadata(
+            {PARQUET_HEADER_KEY: self._dump_header(backup)}
+        )
+        # Entities are free-form nested dicts, so they are stored as JSON text
+        rows = [
+            {
+                **tweet.model_dump(exclude={"entities"}),
+                "entities": orjson.dumps(tweet.entities) if tweet.entities else None,
+            }
+            for tweet in backup.tweets
+        ]
+        table = pa.Table.from_pylist(rows, schema=schema)
+        with open(filepath, "wb") as f:
+            pq.write_table(table, f, compression="zstd")
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _parquet_tweet_schema(pa):
+        timestamp = pa.timestamp("us", tz="UTC")
+        return pa.schema(
+            [
+                ("tweet_id", pa.string()),
+                ("author_username", pa.string()),
+                ("text", pa.string()),
+                ("retweet_count", pa.int64()),
+                ("reply_count", pa.int64()),
+                ("like_count", pa.int64()),
+                ("quote_count", pa.int64()),
+                ("view_count", pa.int64()),
+                ("bookmark_count", pa.int64()),
+                ("is_reply", pa.bool_()),
+                ("reply_to_tweet_id", pa.string()),
+                ("conversation_id", pa.string()),
+                ("in_reply_to_username", pa.string()),
+                ("quoted_tweet_id", pa.string()),
+                ("retweeted_tweet_id", pa.string()),
+                ("entities", pa.binary()),
+                ("tweet_created_at", timestamp),
+                ("fetched_at", timestamp),
+            ]
+        )
+
+    def _link_main_backup(self, snapshot_path: Path) -> None:
+        """Make the main backup file a hard link to a freshly written snapshot"""
+        # Link under a temporary name and rename over the main file, so the main file
+        # gets a new inode and later exports never write into an older snapshot
+        tmp_path = self.main_backup_file.with_name(self.main_backup_file.name + ".tmp")
+        tmp_path.unlink(missing_ok=True)
+        try:
+            os.link(snapshot_path, tmp_path)
+        except OSError:
+            # Hard links unsupported on this filesystem; fall back to a copy
+            shutil.copyfile(snapshot_path, tmp_path)
+        os.replace(tmp_path, self.main_backup_file)
+        self._fsync_backup_dir()
+
+    def _fsync_backup_dir(self) -> None:
+        """Persist renames in the backup directory"""
+        try:
+            dir_fd = os.open(self.backup_dir, os.O_RDONLY)
+        except OSError:
+            # Directories can't be opened for fsync on some platforms (e.g. Windows)
+            return
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
 
     def _load_backup(self, filepath: Path) -> TweetBackup:
-        """Load backup from JSON file"""
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            # Convert string dates to datetime for tweets if needed
-            if "tweets" in data:
-                for tweet in data["tweets"]:
-                    if "tweet_created_at" in tweet and isinstance(tweet["tweet_created_at"], str):
-                        # Parse Twitter date format or ISO format
-                        from email.utils import parsedate_to_datetime
-
-                        try:
-                            tweet["tweet_created_at"] = parsedate_to_datetime(
-                                tweet["tweet_created_at"]
-                            )
-                        except (ValueError, TypeError):
-                            # Try ISO format as fallback
-                            try:
-                                tweet["tweet_created_at"] = datetime.fromisoformat(
-                                    tweet["tweet_created_at"].replace("Z", "+00:00")
-                                )
-                            except (ValueError, TypeError):
-                                # Use current time as last resort
-                                tweet["tweet_created_at"] = datetime.now(timezone.utc)
-            return TweetBackup(**data)
+        """Load backup from an NDJSON, Parquet, or legacy single-document JSON file"""
+        if filepath.suffix == ".parquet":
+            return self._load_parquet_backup(filepath)
+
+        with open(filepath, "rb") as f:
+            if filepath.suffix != ".ndjson":
+                data = orjson.loads(f.read())
+                tweets = [self._parse_tweet_dates(tweet) for tweet in data.get("tweets", [])]
+                return TweetBackup(metadata=data["metadata"], users=data["users"], tweets=tweets)
+
+            # Parse one record at a time rather than the whole file as a single document
+            header = orjson.loads(f.readline())
+            tweets = [self._parse_tweet_dates(orjson.loads(line)) for line in f if line.strip()]
+            return TweetBackup(metadata=header["metadata"], users=header["users"], tweets=tweets)
+
+    def _load_parquet_backup(self, filepath: Path) -> TweetBackup:
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(filepath)
+        header = orjson.loads(table.schema.metadata[PARQUET_HEADER_KEY])
+        # Timestamp columns come back as tz-aware datetimes; only entities need decoding
+        tweets = table.to_pylist()
+        for tweet in tweets:
+            if tweet["entities"] is not None:
+                tweet["entities"] = orjson.loads(tweet["entities"])
+        return TweetBackup(metadata=header["metadata"], users=header["users"], tweets=tweets)
+
+    def _parse_tweet_dates(self, tweet: dict) -> dict:
+        """Convert a string tweet_created_at to datetime if needed"""
+        if "tweet_created_at" in tweet and isinstance(tweet["tweet_created_at"], str):
+            # Parse Twitter date format or ISO format
+            try:
+                tweet["tweet_created_at"] = parsedate_to_datetime(tweet["tweet_created_at"])
+            except (ValueError, TypeError):
+                # Try ISO format as fallback
+                try:
+                    tweet["tweet_created_at"] = datetime.fromisoformat(
+                        tweet["tweet_created_at"].replace("Z", "+00:00")
+                    )
+                except (ValueError, TypeError):
+                    # Use current time as last resort
+                    tweet["tweet_created_at"] = datetime.now(timezone.utc)
+        return tweet
 
     def get_latest_backup(self) -> Optional[TweetBackup]:
         """Get the latest backup if it exists"""
-        if self.main_backup_file.exists():
-            return self._load_backup(self.main_backup_file)
+        backup_path = self._latest_backup_path()
+        if backup_path.exists():
+            return self._load_backup(backup_path)
         return None
 
     def list_backups(self) -> List[Path]:
         """List all available backup files"""
-        return sorted(self.backup_dir.glob("tweets_backup*.json"))
+        return sorted(
+            [
+                *self.backup_dir.glob("tweets_backup*.ndjson"),
+                *self.backup_dir.glob("tweets_backup*.parquet"),
+                *self.backup_dir.glob("tweets_backup*.json"),
+            ]
+        )
 
     async def merge_api_data_to_backup(
         self, users: List[UserInfo], tweets: List[TweetInfo]
@@ -258,6 +443,8 @@ class BackupService:
         """
         # Load existing backup or create new one
         existing = self.get_latest_backup()
+        # One timestamp for every row merged in this call
+        now = datetime.now(timezone.utc)
 
         if existing:
             # Convert to dicts for merging
@@ -273,19 +460,14 @@ class BackupService:
                     location=user.location,
                     num_followers=user.num_followers,
                     num_following=user.num_following,
-                    fetched_at=datetime.now(timezone.utc),
+                    fetched_at=now,
                 )
 
             # Merge tweets
             for tweet in tweets:
-                # Find author username (should be in users)
-                author_username = None
-                for user in users:
-                    if user.username in tweet.tweet_id:  # Simple heuristic
-                        author_username = user.username
-                        break
-
-                if author_username:
+                # Author must be a known user; the API reports it on each tweet
+                author_username = tweet.author_username
+                if author_username and author_username in existing_users:
                     existing_tweets[tweet.tweet_id] = BackupTweet(
                         tweet_id=tweet.tweet_id,
                         author_username=author_username,
@@ -304,7 +486,7 @@ class BackupService:
                         retweeted_tweet_id=tweet.retweeted_tweet_id,
                         entities=None,
                         tweet_created_at=tweet.created_at,
-                        fetched_at=datetime.now(timezone.utc),
+                        fetched_at=now,
                     )
 
             backup_users = list(existing_users.values())
@@ -319,7 +501,7 @@ class BackupService:
                     location=user.location,
                     num_followers=user.num_followers,
                     num_following=user.num_following,
-                    fetched_at=datetime.now(timezone.utc),
+                    fetched_at=now,
                 )
                 for user in users
             ]
@@ -331,7 +513,7 @@ class BackupService:
         # Create new backup object
         backup = TweetBackup(
             metadata=BackupMetadata(
-                exported_at=datetime.now(timezone.utc),
+                exported_at=now,
                 ticker_count=len(backup_users),
                 tweet_count=len(backup_tweets),
                 user_count=len(backup_users),
@@ -341,8 +523,9 @@ class BackupService:
             tweets=backup_tweets,
         )
 
-        # Save backup
-        self._save_backup(backup, self.main_backup_file)
-        self._save_backup(backup, self._get_timestamped_backup_path())
+        # Save the timestamped file once and point the main file at it
+        snapshot_path = self._get_timestamped_backup_path()
+        self._save_backup(backup, snapshot_path)
+        self._link_main_backup(snapshot_path)
 
         return backup
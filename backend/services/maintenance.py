@@ -1,6 +1,6 @@
 import asyncio
 import contextlib
-from datetime import datetime, time, timedelta, timezone
+from datetime import date, datetime, time, timedelta, timezone
 
 from database import get_db_transaction
 from database.repositories_agents import AgentRepository
@@ -21,9 +21,19 @@ class DailyMaintenanceService:
     def __init__(self, run_at_utc: time | None = None):
         # Set default run time to 03:00 AM Eastern Standard Time (EST)
         est = timezone(timedelta(hours=-5), "EST")
-        self.run_at_utc = run_at_utc or time(3, 0, 0, tzinfo=est)  # 03:00 EST default
+        run_at = run_at_utc or time(3, 0, 0, tzinfo=est)  # 03:00 EST default
+        # Normalize to UTC so combining with a UTC date never lands on the wrong day
+        self.run_at_utc = self._to_utc_time(run_at)
         self.running = False
         self._task: asyncio.Task | None = None
+        self._next_run: datetime | None = None
+
+    @staticmethod
+    def _to_utc_time(run_at: time) -> time:
+        """Convert a (possibly offset-aware) time of day to the same instant in UTC"""
+        if run_at.tzinfo is None:
+            return run_at.replace(tzinfo=timezone.utc)
+        return datetime.combine(date(2000, 1, 1), run_at).astimezone(timezone.utc).timetz()
 
     async def start(self) -> None:
         self.running = True
@@ -51,11 +61,14 @@ class DailyMaintenanceService:
 
     async def _sleep_until_next_run(self) -> None:
         now = datetime.now(timezone.utc)
-        today_run = datetime.combine(now.date(), self.run_at_utc)
-        next_run = today_run if now < today_run else today_run + timedelta(days=1)
-        sleep_seconds = (next_run - now).total_seconds()
+        # Compute the schedule once; recompute only if a run was missed (e.g. host suspended)
+        if self._next_run is None or self._next_run <= now:
+            today_run = datetime.combine(now.date(), self.run_at_utc)
+            self._next_run = today_run if now < today_run else today_run + timedelta(days=1)
+        sleep_seconds = (self._next_run - now).total_seconds()
         if sleep_seconds > 0:
             await asyncio.sleep(sleep_seconds)
+        self._next_run += timedelta(days=1)
 
     async def _run_jobs_once(self) -> None:
         # Tweets prune
@@ -2,6 +2,8 @@
 Market data service for AI agents to query exchange information
 """
 
+import functools
+from itertools import islice
 from typing import List
 
 from database import async_session
@@ -15,14 +17,25 @@ from models.responses import (
     RecentTradesResult,
     TradeInfo,
 )
+from models.schemas import OrderBookSnapshot
 
+# Price levels returned per side, so responses scale with depth rather than book size
+ORDER_BOOK_DEPTH = 20
 
-async def get_order_book(ticker: str) -> OrderBookResult:
+
+@functools.lru_cache(maxsize=1)
+def _all_tickers() -> tuple[str, ...]:
+    """Tickers are a static enum, so enumerate them once"""
+    return tuple(Ticker.get_all())
+
+
+async def get_order_book(ticker: str, depth: int = ORDER_BOOK_DEPTH) -> OrderBookResult:
     """
     Get current order book for a ticker.
 
     Args:
         ticker: Symbol to query (e.g., "@elonmusk")
+        depth: Maximum number of price levels per side
 
     Returns:
         OrderBookResult with bid/ask levels
@@ -32,14 +45,14 @@ async def get_order_book(ticker: str) -> OrderBookResult:
 
         snapshot = order_router.get_order_book(ticker)
 
-        # Convert to sorted lists of levels
+        # Snapshot levels are already best-first (copied from the book's SortedDicts)
         bids = [
             OrderBookLevel(price_in_cents=price, quantity=qty)
-            for price, qty in sorted(snapshot.bids.items(), reverse=True)
+            for price, qty in islice(snapshot.bids.items(), depth)
         ]
         asks = [
             OrderBookLevel(price_in_cents=price, quantity=qty)
-            for price, qty in sorted(snapshot.asks.items())
+            for price, qty in islice(snapshot.asks.items(), depth)
         ]
 
         return OrderBookResult(
@@ -54,42 +67,44 @@ async def get_order_book(ticker: str) -> OrderBookResult:
         return OrderBookResult(success=False, error=str(e))
 
 
-async def get_current_price(ticker: str) -> PriceInfo:
-    """
-    Get current price and best bid/ask for a ticker.
-
-    Args:
-        ticker: Symbol to query (e.g., "@elonmusk")
-
-    Returns:
-        PriceInfo with current market prices
-    """
-    Ticker.validate_or_raise(ticker)
-
-    snapshot = order_router.get_order_book(ticker)
-
-    best_bid_in_cents = max(snapshot.bids.keys()) if snapshot.bids else None
-    best_ask_in_cents = min(snapshot.asks.keys()) if snapshot.asks else None
+def _price_info_from_snapshot(ticker: str, snapshot: OrderBookSnapshot) -> PriceInfo:
+    """Build PriceInfo from an order book snapshot"""
+    # Top of book is filled in by the engine, so no scan over the price levels
+    best_bid_in_cents = snapshot.best_bid_in_cents
+    best_ask_in_cents = snapshot.best_ask_in_cents
 
     spread_in_cents = None
     if best_bid_in_cents and best_ask_in_cents:
         spread_in_cents = best_ask_in_cents - best_bid_in_cents
 
-    bid_size = snapshot.bids.get(best_bid_in_cents, 0) if best_bid_in_cents else None
-    ask_size = snapshot.asks.get(best_ask_in_cents, 0) if best_ask_in_cents else None
-
     return PriceInfo(
         ticker=ticker,
         last_price_in_cents=snapshot.last_price_in_cents,
         current_price_in_cents=snapshot.current_price_in_cents,
         best_bid_in_cents=best_bid_in_cents,
         best_ask_in_cents=best_ask_in_cents,
-        bid_size=bid_size,
-        ask_size=ask_size,
+        bid_size=snapshot.bid_size,
+        ask_size=snapshot.ask_size,
         spread_in_cents=spread_in_cents,
     )
 
 
+async def get_current_price(ticker: str) -> PriceInfo:
+    """
+    Get current price and best bid/ask for a ticker.
+
+    Args:
+        ticker: Symbol to query (e.g., "@elonmusk")
+
+    Returns:
+        PriceInfo with current market prices
+    """
+    Ticker.validate_or_raise(ticker)
+
+    snapshot = order_router.get_order_book(ticker)
+    return _price_info_from_snapshot(ticker, snapshot)
+
+
 async def get_all_prices() -> List[PriceInfo]:
     """
     Get current prices for all tickers.
@@ -97,25 +112,29 @@ async def get_all_prices() -> List[PriceInfo]:
     Returns:
         List of PriceInfo for all tradeable tickers
     """
+    # One in-memory pass over every book instead of a routed lookup per ticker
+    snapshots = order_router.get_all_order_books()
+
     prices = []
-    for ticker in Ticker.get_all():
-        try:
-            price_info = await get_current_price(ticker)
-            prices.append(price_info)
-        except Exception:
-            # Include ticker even if no data
-            prices.append(
-                PriceInfo(
-                    ticker=ticker,
-                    last_price_in_cents=None,
-                    current_price_in_cents=None,
-                    best_bid_in_cents=None,
-                    best_ask_in_cents=None,
-                    bid_size=None,
-                    ask_size=None,
-                    spread_in_cents=None,
-                )
+    for ticker in _all_tickers():
+        snapshot = snapshots.get(ticker)
+        if snapshot is not None:
+            prices.append(_price_info_from_snapshot(ticker, snapshot))
+            continue
+
+        # Include ticker even if no data
+        prices.append(
+            PriceInfo(
+                ticker=ticker,
+                last_price_in_cents=None,
+                current_price_in_cents=None,
+                best_bid_in_cents=None,
+                best_ask_in_cents=None,
+                bid_size=None,
+                ask_size=None,
+                spread_in_cents=None,
             )
+        )
     return prices
 
 
@@ -166,4 +185,4 @@ def get_available_tickers() -> List[str]:
     Returns:
         List of ticker symbols
     """
-    return Ticker.get_all()
+    return list(_all_tickers())
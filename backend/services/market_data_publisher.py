@@ -1,71 +1,159 @@
 import asyncio
-from typing import Optional
+import time
+from typing import Any, List, Optional
+from uuid import UUID
 
 import redis.asyncio as redis
-from database import async_session
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from database import engine
 from database.repositories import OutboxRepository
 
+# Channel notified by the market_data_outbox insert trigger
+OUTBOX_NOTIFY_CHANNEL = "market_data_outbox"
+
 
 class MarketDataPublisher:
     """
     Publishes market data events from the outbox table.
-    Uses aggressive batching when busy, backs off when idle.
+    Drains full batches back to back, then sleeps until Postgres notifies of new rows.
     """
 
+    BATCH_SIZE = 100
+    # Safety poll in case a notification is missed
+    NOTIFY_TIMEOUT_SECONDS = 1.0
+    # Poll interval when LISTEN is unavailable (e.g. behind a transaction-mode pooler)
+    POLL_INTERVAL_SECONDS = 0.1
+    # Minimum gap between attempts to re-establish a lost LISTEN connection
+    LISTEN_RETRY_SECONDS = 5.0
+
     def __init__(self, redis_url: str):
         self.redis_client: Optional[redis.Redis] = None
         self.redis_url = redis_url
         self.running = False
+        # Reused by every batch to collect published event ids
+        self._event_ids: List[UUID] = []
+        self._new_events = asyncio.Event()
+        self._listen_conn: Optional[AsyncConnection] = None
+        self._listen_driver: Any = None  # asyncpg connection under _listen_conn
+        self._listen_lost = False
+        self._last_listen_attempt = 0.0
 
     async def start(self):
         """Initialize Redis connection and start publisher loop"""
         self.redis_client = await redis.from_url(self.redis_url)
         self.running = True
+        await self._listen()
         await self._run_publisher_loop()
 
     async def stop(self):
         """Stop publisher and close connections"""
         self.running = False
+        self._new_events.set()
+        await self._close_listen_conn()
         if self.redis_client:
             await self.redis_client.close()
 
+    async def _listen(self):
+        """Subscribe to outbox insert notifications on a dedicated connection"""
+        self._last_listen_attempt = time.monotonic()
+        self._listen_lost = False
+        try:
+            self._listen_conn = await engine.connect()
+            raw = await self._listen_conn.get_raw_connection()
+            self._listen_driver = raw.driver_connection
+            self._listen_driver.add_termination_listener(self._on_listen_terminated)
+            await self._listen_driver.add_listener(OUTBOX_NOTIFY_CHANNEL, self._on_notify)
+        except Exception as e:
+            print(f"Market data publisher LISTEN unavailable, polling instead: {e}")
+            await self._close_listen_conn()
+
+    async def _ensure_listening(self) -> bool:
+        """Re-subscribe if the LISTEN connection dropped; returns whether it is live"""
+        if self._listen_conn is not None and not self._listen_lost:
+            return True
+        if time.monotonic() - self._last_listen_attempt >= self.LISTEN_RETRY_SECONDS:
+            await self._close_listen_conn()
+            await self._listen()
+        return self._listen_conn is not None and not self._listen_lost
+
+    async def _close_listen_conn(self):
+        if self._listen_conn is None:
+            return
+        conn, self._listen_conn = self._listen_conn, None
+        driver, self._listen_driver = self._listen_driver, None
+        try:
+            if driver is not None and not driver.is_closed():
+                # The connection goes back to the pool, so stop listening on it first
+                driver.remove_termination_listener(self._on_listen_terminated)
+                await driver.remove_listener(OUTBOX_NOTIFY_CHANNEL, self._on_notify)
+            await conn.close()
+        except Exception as e:
+            # A dropped connection may fail to close cleanly; it is discarded either way
+            print(f"Market data publisher LISTEN close failed: {e}")
+
+    def _on_notify(self, *args):
+        self._new_events.set()
+
+    def _on_listen_terminated(self, connection):
+        if connection is not self._listen_driver:
+            return
+        self._listen_lost = True
+        # Wake the loop so it switches to polling right away
+        self._new_events.set()
+
     async def _run_publisher_loop(self):
         """
-        Main publisher loop with adaptive batching.
-        Processes aggressively when busy, backs off when idle.
+        Main publisher loop.
+        Drains the outbox, then waits for a notification (or the safety timeout).
+        Reopens its connection if it breaks.
         """
-        consecutive_empty_batches = 0
+        while self.running:
+            try:
+                # One connection and session for as long as it stays healthy rather than a
+                # pool checkout per batch; committing or rolling back keeps it checked out
+                async with engine.connect() as conn, AsyncSession(
+                    bind=conn, expire_on_commit=False
+                ) as session:
+                    await self._publish_until_stopped(session)
+            except Exception as e:
+                print(f"Market data publisher connection error, reconnecting: {e}")
+                await asyncio.sleep(1.0)  # Error backoff
+
+    async def _publish_until_stopped(self, session: AsyncSession):
+        """Publish batches on one session; raises if the session can't be recovered"""
+        outbox_repo = OutboxRepository(session)
 
         while self.running:
             try:
-                # Create new session for each batch
-                async with async_session() as session:
-                    outbox_repo = OutboxRepository(session)
+                # Cleared before reading so inserts committed after this point wake us
+                self._new_events.clear()
 
-                    # Publish batch (this commits autonomously)
-                    published_count = await outbox_repo.publish_batch_with_commit(
-                        redis_client=self.redis_client, limit=100
-                    )
+                # Publish batch (this commits autonomously)
+                published_count = await outbox_repo.publish_batch_with_commit(
+                    redis_client=self.redis_client,
+                    limit=self.BATCH_SIZE,
+                    event_ids=self._event_ids,
+                )
+                # End the read transaction an empty batch leaves open
+                await session.rollback()
 
-                # Adaptive sleep based on activity
-                if published_count >= 100:
+                if published_count >= self.BATCH_SIZE:
                     # Full batch - process immediately
-                    consecutive_empty_batches = 0
-                    continue
-
-                if published_count > 0:
-                    # Partial batch - short delay
-                    consecutive_empty_batches = 0
-                    await asyncio.sleep(0.01)  # 10ms
                     continue
 
-                # Empty batch - progressive backoff
-                consecutive_empty_batches += 1
-                if consecutive_empty_batches < 10:
-                    await asyncio.sleep(0.1)  # 100ms
-                else:
-                    await asyncio.sleep(1.0)  # 1 second max backoff
+                timeout = (
+                    self.NOTIFY_TIMEOUT_SECONDS
+                    if await self._ensure_listening()
+                    else self.POLL_INTERVAL_SECONDS
+                )
+                try:
+                    await asyncio.wait_for(self._new_events.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
 
             except Exception as e:
                 print(f"Market data publisher error: {e}")
+                # A failed rollback means the connection is gone; the caller reopens it
+                await session.rollback()
                 await asyncio.sleep(1.0)  # Error backoff
@@ -4,9 +4,11 @@ These functions are designed to be used as tool calls in LangGraph agents.
 """
 
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Dict, Optional
 from uuid import UUID
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from database import get_db_transaction
 from database.repositories import (
     LedgerRepository,
@@ -20,6 +22,12 @@ from models.core import Ticker
 from models.responses import OrderStatusResponse, PortfolioResponse, PositionInfo
 from models.schemas import OrderRequest
 
+_UTC = timezone.utc
+# Time-in-force values come from a handful of defaults, so their timedeltas are reused
+_TIF_CACHE: Dict[int, timedelta] = {}
+# tif_seconds is caller-supplied, so stop memoizing new values past this many
+_TIF_CACHE_MAX = 256
+
 
 async def place_buy_order(
     trader_id: UUID,
@@ -43,7 +51,9 @@ async def place_buy_order(
     Returns:
         UUID of the created order
     """
-    await _validate_buy_order(trader_id, quantity, order_type, limit_price_in_cents)
+    if order_type == OrderType.LIMIT and limit_price_in_cents is None:
+        raise ValueError("Limit price required for LIMIT orders")
+
     return await _submit_order(
         trader_id,
         ticker,
@@ -77,7 +87,6 @@ async def place_sell_order(
     Returns:
         UUID of the created order
     """
-    await _validate_sell_order(trader_id, ticker, quantity)
     return await _submit_order(
         trader_id,
         ticker,
@@ -106,14 +115,7 @@ async def place_admin_order(
     if order_type == OrderType.LIMIT and limit_price_in_cents is None:
         raise ValueError("Limit price required for LIMIT orders")
 
-    # Enforce ticker validity
-    Ticker.validate_or_raise(ticker)
-
-    # For sells, ensure the admin owns enough shares
-    if side == Side.SELL:
-        await _validate_sell_order(trader_id, ticker, quantity)
-
-    # For buys, skip cash balance validation to allow unlimited funding
+    # Sells still check share ownership; buys skip cash validation to allow unlimited funding
     return await _submit_order(
         trader_id,
         ticker,
@@ -122,6 +124,7 @@ async def place_admin_order(
         quantity,
         limit_price_in_cents,
         tif_seconds,
+        validate_buy=False,
     )
 
 
@@ -198,22 +201,20 @@ async def get_portfolio(trader_id: UUID) -> PortfolioResponse:
         PortfolioResponse with cash balance and positions
     """
     async with get_db_transaction() as session:
-        ledger_repo = LedgerRepository(session)
         position_repo = PositionRepository(session)
+        snapshot = await position_repo.get_portfolio_snapshot(trader_id)
 
-        cash_balance = await ledger_repo.get_cash_balance_in_cents(trader_id)
-        positions = await position_repo.get_all_positions(trader_id)
-
+        # Column values are already typed by the database, so skip re-validation
         return PortfolioResponse(
             trader_id=trader_id,
-            cash_balance_in_cents=cash_balance,
+            cash_balance_in_cents=snapshot.cash_balance_in_cents,
             positions=[
-                PositionInfo(
+                PositionInfo.model_construct(
                     ticker=pos.ticker,
                     quantity=pos.quantity,
                     avg_cost_in_cents=pos.avg_cost,
                 )
-                for pos in positions
+                for pos in snapshot.positions
             ],
         )
 
@@ -247,47 +248,57 @@ async def create_trader(
 # Helper functions (private)
 
 
-async def _validate_buy_order(
+async def _validate_buy_order_without_commit(
+    session: AsyncSession,
     trader_id: UUID,
     quantity: int,
     order_type: OrderType,
     limit_price_in_cents: Optional[int],
 ) -> None:
     """Validate buy order has sufficient cash"""
-    if order_type == OrderType.LIMIT and limit_price_in_cents is None:
-        raise ValueError("Limit price required for LIMIT orders")
-
-    async with get_db_transaction() as session:
-        trader_repo = TraderRepository(session)
-        trader = await trader_repo.get_trader_or_none(trader_id)
+    trader_repo = TraderRepository(session)
+    # One query for the active flag and (for LIMIT) cash; it also locks the trader row so
+    # concurrent orders from this trader validate one at a time
+    state = await trader_repo.get_trader_state_for_validation_or_none(
+        trader_id, include_cash=order_type == OrderType.LIMIT
+    )
 
-        if not trader or not trader.is_active:
-            raise ValueError(f"Invalid or inactive trader: {trader_id}")
+    if not state or not state.is_active:
+        raise ValueError(f"Invalid or inactive trader: {trader_id}")
 
-        if order_type == OrderType.LIMIT:
-            assert limit_price_in_cents is not None
-            ledger_repo = LedgerRepository(session)
-            cash_balance = await ledger_repo.get_cash_balance_in_cents(trader_id)
-            required_cash = quantity * limit_price_in_cents
+    if order_type == OrderType.LIMIT:
+        assert limit_price_in_cents is not None
+        assert state.cash_balance_in_cents is not None
+        cash_balance = state.cash_balance_in_cents
+        required_cash = quantity * limit_price_in_cents
 
-            if cash_balance < required_cash:
-                raise ValueError(
-                    f"Insufficient cash: have ${cash_balance/100:.2f}, "
-                    f"need ${required_cash/100:.2f}"
-                )
+        if cash_balance < required_cash:
+            raise ValueError(
+                f"Insufficient cash: have ${cash_balance/100:.2f}, "
+                f"need ${required_cash/100:.2f}"
+            )
 
 
-async def _validate_sell_order(trader_id: UUID, ticker: str, quantity: int) -> None:
+async def _validate_sell_order_without_commit(
+    session: AsyncSession, trader_id: UUID, ticker: str, quantity: int
+) -> None:
     """Validate sell order has sufficient shares"""
-    Ticker.validate_or_raise(ticker)
+    position_repo = PositionRepository(session)
+    position = await position_repo.get_position_or_none(trader_id, ticker)
 
-    async with get_db_transaction() as session:
-        position_repo = PositionRepository(session)
-        position = await position_repo.get_position_or_none(trader_id, ticker)
+    if not position or position.quantity < quantity:
+        available = position.quantity if position else 0
+        raise ValueError(f"Insufficient shares of {ticker}: have {available}, need {quantity}")
 
-        if not position or position.quantity < quantity:
-            available = position.quantity if position else 0
-            raise ValueError(f"Insufficient shares of {ticker}: have {available}, need {quantity}")
+
+def _tif_delta(tif_seconds: int) -> timedelta:
+    """Return the (memoized) timedelta for a time-in-force in seconds"""
+    delta = _TIF_CACHE.get(tif_seconds)
+    if delta is None:
+        delta = timedelta(seconds=tif_seconds)
+        if len(_TIF_CACHE) < _TIF_CACHE_MAX:
+            _TIF_CACHE[tif_seconds] = delta
+    return delta
 
 
 async def _submit_order(
@@ -298,8 +309,10 @@ async def _submit_order(
     quantity: int,
     limit_price_in_cents: Optional[int],
     tif_seconds: int,
+    validate_buy: bool = True,
 ) -> UUID:
-    """Submit order to the exchange"""
+    """Validate and submit order to the exchange in a single transaction"""
+    # A hash lookup in the enum's value map, so cheaper than any cache in front of it
     Ticker.validate_or_raise(ticker)
 
     order_request = OrderRequest(
@@ -313,8 +326,15 @@ async def _submit_order(
     )
 
     async with get_db_transaction() as session:
+        if side == Side.SELL:
+            await _validate_sell_order_without_commit(session, trader_id, ticker, quantity)
+        elif validate_buy:
+            await _validate_buy_order_without_commit(
+                session, trader_id, quantity, order_type, limit_price_in_cents
+            )
+
         order_repo = OrderRepository(session)
-        expires_at = datetime.now(timezone.utc) + timedelta(seconds=tif_seconds)
+        expires_at = datetime.now(_UTC) + _tif_delta(tif_seconds)
         order = await order_repo.create_order_without_commit(order_request, expires_at)
         await session.commit()
         order_id = order.order_id
@@ -1,53 +1,142 @@
+import asyncio
 import os
-from typing import List
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
+import httpx
+import orjson
 
 from models.schemas.x_api import TweetInfo, UserInfo
 
+__all__ = ["XApiClient"]
+
 
 class XApiClient:
+    BASE_URL = "https://api.twitterapi.io"
+    REQUEST_TIMEOUT_SECONDS = 10.0
+    # Attempts for 5xx responses; connection errors are retried by the transport
+    MAX_ATTEMPTS = 3
+    RETRY_BASE_DELAY_SECONDS = 0.5
+    # Profiles change slowly; within this window get_user_info answers from memory
+    USER_INFO_TTL_SECONDS = 60.0
+    USER_INFO_CACHE_MAX = 1024
+    # IDs per /twitter/tweets request, keeping the query string a sane length
+    TWEET_IDS_PER_REQUEST = 100
+
+    # Shared by every instance so TCP/TLS connections are pooled and reused
+    _client: Optional[httpx.AsyncClient] = None
+    # (api key, lowercased handle) -> (monotonic expiry, ETag, user info); keyed by API key so
+    # clients configured with different keys never see each other's responses
+    _user_info_cache: Dict[Tuple[Optional[str], str], Tuple[float, Optional[str], UserInfo]] = {}
+
     def __init__(self):
         self.api_key = os.getenv("TWITTER_API_KEY")
-        self.base_url = "https://api.twitterapi.io"
-        self.headers = {"X-API-Key": self.api_key}
+        self.base_url = self.BASE_URL
+        # httpx rejects None header values (requests silently dropped them)
+        self.headers = {"X-API-Key": self.api_key} if self.api_key else {}
+
+    @classmethod
+    def _get_client(cls) -> httpx.AsyncClient:
+        if cls._client is None or cls._client.is_closed:
+            cls._client = httpx.AsyncClient(
+                base_url=cls.BASE_URL,
+                timeout=cls.REQUEST_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+                transport=httpx.AsyncHTTPTransport(retries=3),
+            )
+        return cls._client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close the shared HTTP client (call on shutdown)"""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    async def _request(
+        self, path: str, params: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+    ) -> httpx.Response:
+        """GET an API endpoint, retrying 5xx responses, and return the raw response"""
+        client = self._get_client()
+        request_headers = {**self.headers, **headers} if headers else self.headers
+        for attempt in range(self.MAX_ATTEMPTS):
+            response = await client.get(path, headers=request_headers, params=params)
+            if response.status_code < 500 or attempt == self.MAX_ATTEMPTS - 1:
+                break
+            await asyncio.sleep(self.RETRY_BASE_DELAY_SECONDS * 2**attempt)
+        # httpx treats 304 as an error, but it is the expected answer to If-None-Match
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _decode(response: httpx.Response) -> Dict[str, Any]:
+        """Decode a response body and check the API's success status"""
+        # orjson parses the (often 100s of KB) tweet payloads much faster than stdlib json
+        result = orjson.loads(response.content)
+        if result.get("status") != "success":
+            raise Exception(f"API error: {result.get('message', 'Unknown error')}")
+        return result
+
+    async def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """GET an API endpoint and return the decoded success payload"""
+        return self._decode(await self._request(path, params))
 
-    def get_user_info(self, handle: str) -> UserInfo:
+    async def get_user_info(self, handle: str) -> UserInfo:
         """Get user information by handle/username.
 
         Args:
             handle: Twitter username (without @)
 
+        Responses are cached for USER_INFO_TTL_SECONDS; after that the cached ETag (if the
+        API sent one) is revalidated with If-None-Match.
+
         Returns:
             UserInfo model with user details
 
         Raises:
-            requests.HTTPError: If API request fails
+            httpx.HTTPStatusError: If API request fails
             Exception: If API returns error status
         """
-        url = f"{self.base_url}/twitter/user/info"
-        params = {"userName": handle}
-
-        response = requests.get(url, headers=self.headers, params=params)
-        response.raise_for_status()
-
-        result = response.json()
-        if result.get("status") != "success":
-            raise Exception(f"API error: {result.get('message', 'Unknown error')}")
-
-        data = result.get("data", {})
-
-        # Map API response fields to our model
-        return UserInfo(
-            username=data.get("userName"),
-            name=data.get("name"),
-            description=data.get("description"),
-            location=data.get("location"),
-            num_followers=data.get("followers", 0),
-            num_following=data.get("following", 0),
+        key = (self.api_key, handle.lower())
+        cached = self._user_info_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            return cached[2]
+
+        etag = cached[1] if cached is not None else None
+        response = await self._request(
+            "/twitter/user/info",
+            {"userName": handle},
+            headers={"If-None-Match": etag} if etag else None,
         )
 
-    def get_last_tweets(self, handle: str, num_tweets: int = 20) -> List[TweetInfo]:
+        if response.status_code == 304 and cached is not None:
+            user_info = cached[2].model_copy(update={"fetched_at": datetime.now(timezone.utc)})
+        else:
+            data = self._decode(response).get("data", {})
+
+            # Map API response fields to our model
+            user_info = UserInfo(
+                username=data.get("userName"),
+                name=data.get("name"),
+                description=data.get("description"),
+                location=data.get("location"),
+                num_followers=data.get("followers", 0),
+                num_following=data.get("following", 0),
+                fetched_at=datetime.now(timezone.utc),
+            )
+            etag = response.headers.get("ETag")
+
+        cache = self._user_info_cache
+        if key not in cache and len(cache) >= self.USER_INFO_CACHE_MAX:
+            # Drop the oldest insertion; dicts keep insertion order
+            del cache[next(iter(cache))]
+        cache[key] = (now + self.USER_INFO_TTL_SECONDS, etag, user_info)
+        return user_info
+
+    async def get_last_tweets(self, handle: str, num_tweets: int = 20) -> List[TweetInfo]:
         """Get the last tweets from a user.
 
         Args:
@@ -58,64 +147,56 @@ class XApiClient:
             List of Tweet models
 
         Raises:
-            requests.HTTPError: If API request fails
+            httpx.HTTPStatusError: If API request fails
             Exception: If API returns error status
         """
 
         all_tweets: List[TweetInfo] = []
-        cursor = ""
-        page_count = 0
-
-        # Paginate through results to get requested number of tweets
-        while len(all_tweets) < num_tweets:
-            page_count += 1
-            url = f"{self.base_url}/twitter/user/last_tweets"
-            # Start with minimal params like the working curl command
-            params = {
-                "userName": handle,
-                "cursor": cursor,
-                "includeReplies": False,
-            }
-            # Only add cursor if we have one (for pagination)
-            if cursor:
-                params["cursor"] = cursor
-
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-
-            result = response.json()
-
-            if result.get("status") != "success":
-                raise Exception(f"API error: {result.get('message', 'Unknown error')}")
-
-            # Check if tweets are in data.tweets (nested) or directly in tweets
-            if "data" in result and "tweets" in result["data"]:
-                tweets = result["data"]["tweets"]
-            else:
-                tweets = result.get("tweets", [])
-
-            if not tweets:
-                break
-
-            for tweet_data in tweets:
-                if len(all_tweets) >= num_tweets:
+        # Cursors are opaque, so pages can't be fetched in parallel; instead the next page
+        # is requested before the current one is parsed
+        next_page: Optional[asyncio.Task] = asyncio.create_task(self._get_tweets_page(handle, ""))
+
+        try:
+            # Paginate through results to get requested number of tweets
+            while next_page is not None:
+                result = await next_page
+                next_page = None
+
+                # Check if tweets are in data.tweets (nested) or directly in tweets
+                if "data" in result and "tweets" in result["data"]:
+                    tweets = result["data"]["tweets"]
+                else:
+                    tweets = result.get("tweets", [])
+
+                if not tweets:
                     break
 
-                all_tweets.append(TweetInfo.from_api_response(tweet_data))
+                # Check if there are more pages, and whether we still need them
+                cursor = result.get("next_cursor", "") if result.get("has_next_page") else ""
+                if cursor and len(all_tweets) + len(tweets) < num_tweets:
+                    next_page = asyncio.create_task(self._get_tweets_page(handle, cursor))
 
-            # Check if there are more pages
-            has_next = result.get("has_next_page", False)
+                for tweet_data in tweets:
+                    if len(all_tweets) >= num_tweets:
+                        break
 
-            if not has_next:
-                break
-
-            cursor = result.get("next_cursor", "")
-            if not cursor:
-                break
+                    all_tweets.append(TweetInfo.from_api_response(tweet_data))
+        finally:
+            if next_page is not None:
+                next_page.cancel()
 
         return all_tweets[:num_tweets]
 
-    def get_tweet_by_ids(self, tweet_ids: List[str]) -> List[TweetInfo]:
+    async def _get_tweets_page(self, handle: str, cursor: str) -> Dict[str, Any]:
+        # Start with minimal params like the working curl command
+        params = {
+            "userName": handle,
+            "cursor": cursor,
+            "includeReplies": False,
+        }
+        return await self._get("/twitter/user/last_tweets", params)
+
+    async def get_tweet_by_ids(self, tweet_ids: List[str]) -> List[TweetInfo]:
         """Get tweets by their IDs.
 
         Args:
@@ -125,21 +206,23 @@ class XApiClient:
             List of Tweet models
 
         Raises:
-            requests.HTTPError: If API request fails
+            httpx.HTTPStatusError: If API request fails
             Exception: If API returns error status
         """
         if not tweet_ids:
             return []
 
-        url = f"{self.base_url}/twitter/tweets"
-        params = {"tweet_ids": ",".join(tweet_ids)}
-
-        response = requests.get(url, headers=self.headers, params=params)
-        response.raise_for_status()
-
-        result = response.json()
-        if result.get("status") != "success":
-            raise Exception(f"API error: {result.get('message', 'Unknown error')}")
+        # Large ID lists are split into chunks fetched concurrently over the shared pool
+        size = self.TWEET_IDS_PER_REQUEST
+        pages = await asyncio.gather(
+            *(
+                self._get("/twitter/tweets", {"tweet_ids": ",".join(tweet_ids[i : i + size])})
+                for i in range(0, len(tweet_ids), size)
+            )
+        )
 
-        tweets = result.get("tweets", [])
-        return [TweetInfo.from_api_response(tweet_data) for tweet_data in tweets]
+        return [
+            TweetInfo.from_api_response(tweet_data)
+            for result in pages
+            for tweet_data in result.get("tweets", [])
+        ]
@@ -2,11 +2,14 @@
 Service for processing webhook data from TwitterAPI.io
 """
 
+import logging
 import os
+import time
 from datetime import datetime, timezone
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from database.repositories import XDataRepository
+from database.repositories_x_data import parse_twitter_date
 from models.core import Ticker
 from models.schemas.webhook import (
     ProcessedTweet,
@@ -18,14 +21,24 @@ from models.schemas.webhook import (
 )
 from models.schemas.x_api import TweetInfo, UserInfo
 
+logger = logging.getLogger(__name__)
+
+# Ticker usernames without @ prefix, lowercased; tickers are static so build this once
+_VALID_USERNAMES = frozenset(ticker.value.removeprefix("@").lower() for ticker in Ticker)
+
 
 class XWebhookService:
     """Service for processing and storing webhook tweet data"""
 
+    # How long a username confirmed in the database skips the author insert
+    KNOWN_USER_TTL_SECONDS = 60.0
+    # Per-tweet errors listed in a result; the errors count still covers all of them
+    MAX_REPORTED_ERRORS = 100
+
     def __init__(self):
         self.expected_api_key = os.getenv("TWITTER_API_KEY")
-        # Get all valid usernames without @ prefix
-        self.valid_usernames = {ticker.value.lstrip("@").lower() for ticker in Ticker}
+        # username -> monotonic expiry; only ticker usernames get here, so it stays tiny
+        self._known_users: Dict[str, float] = {}
 
     def verify_api_key(self, received_api_key: str) -> bool:
         """Verify the webhook request is from TwitterAPI.io"""
@@ -33,13 +46,48 @@ class XWebhookService:
 
     def is_valid_username(self, username: str) -> bool:
         """Check if username (without @) is in our tickers list"""
-        return username.lower() in self.valid_usernames
+        return username.lower() in _VALID_USERNAMES
+
+    def drop_untracked_raw_tweets(self, data: Any) -> List[SkippedTweet]:
+        """
+        Remove tweets by non-ticker authors from a decoded payload before validation.
+        Entries that don't look like tweets are left for validation to reject.
+        """
+        if not isinstance(data, dict) or not isinstance(data.get("tweets"), list):
+            return []
+
+        kept: List[Any] = []
+        skipped: List[SkippedTweet] = []
+        for raw in data["tweets"]:
+            author = raw.get("author") if isinstance(raw, dict) else None
+            username = (
+                author.get("userName", author.get("username")) if isinstance(author, dict) else None
+            )
+            tweet_id = raw.get("id") if isinstance(raw, dict) else None
+            if (
+                isinstance(username, str)
+                and isinstance(tweet_id, str)
+                and username.lower() not in _VALID_USERNAMES
+            ):
+                skipped.append(
+                    SkippedTweet(
+                        tweet_id=tweet_id,
+                        username=username,
+                        reason="Username not in tickers list",
+                    )
+                )
+            else:
+                kept.append(raw)
+        data["tweets"] = kept
+        return skipped
 
     def webhook_tweet_to_model(
         self, webhook_tweet: WebhookTweet, fetched_at: datetime
     ) -> TweetInfo:
         """Convert webhook tweet format to our Tweet model"""
-        return TweetInfo(
+        # WebhookTweet is already validated, so skip re-validation; created_at is the only
+        # field TweetInfo would coerce, so parse it here
+        return TweetInfo.model_construct(
             tweet_id=webhook_tweet.id,
             text=webhook_tweet.text,
             retweet_count=webhook_tweet.retweet_count,
@@ -47,7 +95,7 @@ class XWebhookService:
             like_count=webhook_tweet.like_count,
             quote_count=webhook_tweet.quote_count or 0,
             view_count=webhook_tweet.view_count or 0,
-            created_at=webhook_tweet.created_at,
+            created_at=parse_twitter_date(webhook_tweet.created_at),
             bookmark_count=webhook_tweet.bookmark_count or 0,
             is_reply=webhook_tweet.is_reply or False,
             reply_to_tweet_id=webhook_tweet.in_reply_to_id,
@@ -63,7 +111,7 @@ class XWebhookService:
         self, webhook_tweet: WebhookTweet, fetched_at: datetime
     ) -> UserInfo:
         """Create minimal UserInfo from webhook data"""
-        return UserInfo(
+        return UserInfo.model_construct(
             username=webhook_tweet.author.username,
             name=webhook_tweet.author.name,
             description=None,
@@ -74,21 +122,30 @@ class XWebhookService:
         )
 
     async def process_webhook_without_commit(
-        self, repo: XDataRepository, payload: WebhookPayload
+        self,
+        repo: XDataRepository,
+        payload: WebhookPayload,
+        skipped_tweets: Optional[List[SkippedTweet]] = None,
     ) -> WebhookProcessingResult:
         """
         Process webhook payload and store tweets/users in database.
         Caller must manage transaction boundaries.
+        skipped_tweets carries tweets already dropped by drop_untracked_raw_tweets.
 
         Returns:
             WebhookProcessingResult with processing details
         """
         processed_tweets: List[ProcessedTweet] = []
-        skipped_tweets: List[SkippedTweet] = []
+        skipped_tweets = list(skipped_tweets) if skipped_tweets else []
         processing_errors: List[ProcessingError] = []
+        error_count = 0
 
         fetched_at = datetime.now(timezone.utc)
-        for webhook_tweet in payload.tweets:
+
+        # Partition and convert in Python first, so the database sees whole batches
+        users: List[UserInfo] = []
+        tweets: List[tuple[TweetInfo, str]] = []
+        for webhook_tweet in payload.tweets or []:
             try:
                 # Validate username is in our tickers list
                 if not self.is_valid_username(webhook_tweet.author.username):
@@ -101,32 +158,54 @@ class XWebhookService:
                     )
                     continue
 
-                # First ensure user exists in database
-                user = await repo.get_user_or_none(webhook_tweet.author.username)
-                if not user:
-                    # Create minimal user record - will be enriched later
-                    user_info = self.create_user_info_from_webhook(webhook_tweet, fetched_at)
-                    await repo.upsert_user_without_commit(user_info)
-
-                # Convert and store tweet
-                tweet = self.webhook_tweet_to_model(webhook_tweet, fetched_at)
-                await repo.upsert_tweet_without_commit(tweet, webhook_tweet.author.username)
-
-                processed_tweets.append(
-                    ProcessedTweet(
-                        tweet_id=webhook_tweet.id,
-                        username=webhook_tweet.author.username,
+                # Minimal user record - only inserted if missing, enriched later
+                users.append(self.create_user_info_from_webhook(webhook_tweet, fetched_at))
+                tweets.append(
+                    (
+                        self.webhook_tweet_to_model(webhook_tweet, fetched_at),
+                        webhook_tweet.author.username,
                     )
                 )
 
             except Exception as e:
-                print("ERROR", e)
-                processing_errors.append(ProcessingError(tweet_id=webhook_tweet.id, error=str(e)))
+                logger.warning("Webhook tweet %s failed: %s", webhook_tweet.id, e, exc_info=e)
+                error_count += 1
+                if len(processing_errors) < self.MAX_REPORTED_ERRORS:
+                    processing_errors.append(
+                        ProcessingError(tweet_id=webhook_tweet.id, error=str(e))
+                    )
+
+        if tweets:
+            try:
+                # Authors first so the tweets' foreign keys resolve
+                now = time.monotonic()
+                unknown_users = [u for u in users if self._known_users.get(u.username, 0) <= now]
+                if unknown_users:
+                    inserted = await repo.bulk_insert_missing_users_without_commit(unknown_users)
+                    # Users that already existed are committed, so remembering them is safe;
+                    # users inserted here aren't until the caller commits
+                    expires_at = now + self.KNOWN_USER_TTL_SECONDS
+                    for username in {u.username for u in unknown_users}.difference(inserted):
+                        self._known_users[username] = expires_at
+                await repo.bulk_upsert_tweets_without_commit(tweets)
+            except Exception as e:
+                # Batch statements succeed or fail together
+                logger.warning("Webhook batch of %d tweets failed: %s", len(tweets), e, exc_info=e)
+                error_count += len(tweets)
+                processing_errors.extend(
+                    ProcessingError(tweet_id=tweet.tweet_id, error=str(e))
+                    for tweet, _ in tweets[: self.MAX_REPORTED_ERRORS - len(processing_errors)]
+                )
+            else:
+                processed_tweets.extend(
+                    ProcessedTweet(tweet_id=tweet.tweet_id, username=username)
+                    for tweet, username in tweets
+                )
 
         return WebhookProcessingResult(
             processed=len(processed_tweets),
             skipped=len(skipped_tweets),
-            errors=len(processing_errors),
+            errors=error_count,
             processed_tweets=processed_tweets,
             skipped_tweets=skipped_tweets,
             processing_errors=processing_errors,